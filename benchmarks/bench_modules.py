@@ -0,0 +1,289 @@
+"""
+Offline module benchmarks against local stand-in targets.
+
+Each scenario runs in a fresh child process against the stand-ins in
+benchmarks/standins.py and prints one JSON object: wall time, probes per
+second (from core.metrics), per-target latency and peak RSS. No network
+access is needed; the TLS scenarios need the openssl command for a
+throwaway certificate.
+
+    python benchmarks/bench_modules.py                       # every scenario
+    python benchmarks/bench_modules.py --scenarios ports,web --out bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ["ports", "ports-filtered", "web", "api", "ad", "tls", "tls-enum", "wireless", "report",
+             "fingerprint"]
+
+
+def _probes(metrics):
+    return sum(s.count for (_, check, _), s in metrics.items() if check != "job")
+
+
+def _timed(func, targets):
+    latencies = []
+    start = time.perf_counter()
+    for target in targets:
+        t = time.perf_counter()
+        func(target)
+        latencies.append(time.perf_counter() - t)
+    return time.perf_counter() - start, latencies
+
+
+def bench_ports(args):
+    from modules.ports import port_scan
+    from standins import TCPFarm
+    with TCPFarm(args.listeners):
+        ports = list(range(1, args.ports + 1))
+        elapsed, latencies = _timed(lambda host: port_scan(host, ports=ports), ["127.0.0.1"])
+    return elapsed, latencies, {"ports": len(ports), "listeners": args.listeners}
+
+
+def bench_ports_filtered(args):
+    # Open, closed and dropped ports mixed: the first answers seed the RTT
+    # estimate that bounds the wait on every filtered port
+    from modules.ports import port_scan
+    from standins import BlackHoles, TCPFarm
+    with TCPFarm(args.listeners) as farm, BlackHoles(args.filtered) as holes:
+        ports = sorted(set(range(1, 1025)) | set(farm.ports) | set(holes.ports))
+        elapsed, latencies = _timed(lambda host: port_scan(host, ports=ports), ["127.0.0.1"])
+    return elapsed, latencies, {"ports": len(ports), "listeners": args.listeners,
+                                "filtered": args.filtered}
+
+
+def _http_standin(args):
+    from standins import HTTPStandIn
+    return HTTPStandIn(
+        headers={"Server": "standin", "X-Frame-Options": "DENY"},
+        cookies=["session=abc; Path=/"],
+        paths={"/admin": 200, "/.git": 200, "/debug": 403},
+        latency=args.latency,
+        etag='"v1"')
+
+
+def bench_web(args):
+    from modules.web import web_scan
+    with _http_standin(args) as server:
+        targets = [f"{server.url}/?t={i}" for i in range(args.targets)]
+        elapsed, latencies = _timed(web_scan, targets)
+    return elapsed, latencies, {"targets": args.targets, "latency": args.latency}
+
+
+def bench_api(args):
+    from modules.api import api_scan
+    with _http_standin(args) as server:
+        targets = [f"{server.url}/?t={i}" for i in range(args.targets)]
+        elapsed, latencies = _timed(api_scan, targets)
+    return elapsed, latencies, {"targets": args.targets, "latency": args.latency}
+
+
+def bench_ad(args):
+    # AD ports need root to bind, so this measures the refused path on loopback
+    from modules.ad import ad_scan
+    from core.portstate import get_port_states
+
+    def check(target):
+        if get_port_states() is not None:
+            get_port_states().clear()  # measure connects, not the run-wide table
+        ad_scan(target)
+
+    elapsed, latencies = _timed(check, ["127.0.0.1"] * args.targets)
+    return elapsed, latencies, {"targets": args.targets}
+
+
+def _bench_tls(args, enum):
+    from modules.tls import tls_check
+    from core import tlsprobe
+    from standins import TLSStandIn, self_signed_cert
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = self_signed_cert(tmp)
+        with TLSStandIn(cert, key, "TLSv1_2", "TLSv1_3") as modern, \
+                TLSStandIn(cert, key, "TLSv1", "TLSv1_2") as legacy:
+            targets = [modern.target, legacy.target] * max(1, args.targets // 2)
+            weak = set()
+
+            def check(target):
+                tlsprobe.clear()  # measure handshakes, not the per-run cache
+                for f in tls_check(target, enum=enum):
+                    if f.check_id == "tls.weak_protocol" and target == legacy.target:
+                        weak.add(f.desc.rsplit(" ", 1)[-1])
+
+            elapsed, latencies = _timed(check, targets)
+    if not enum:
+        return elapsed, latencies, {"targets": len(targets)}
+    # Enumeration must find what the legacy stand-in accepts, or it measured nothing
+    if weak != {"TLSv1", "TLSv1.1"}:
+        raise RuntimeError(f"tls-enum found weak protocols {sorted(weak)}, expected TLSv1 and TLSv1.1")
+    return elapsed, latencies, {"targets": len(targets), "weak_protocols": sorted(weak)}
+
+
+def bench_tls(args):
+    return _bench_tls(args, enum=False)
+
+
+def bench_tls_enum(args):
+    return _bench_tls(args, enum=True)
+
+
+def bench_wireless(args):
+    from modules.wireless import wireless_scan
+    from standins import FakeNmcli
+    security = ["WPA2", "WPA3", "--", "WEP", "WPA1 WPA2"]
+    networks = [{"SSID": f"net-{i}", "SECURITY": security[i % len(security)], "SIGNAL": 30 + i % 70,
+                 "BSSID": f"AA:BB:CC:DD:{i // 256 % 256:02X}:{i % 256:02X}", "CHAN": 1 + i % 11}
+                for i in range(args.networks)]
+    with FakeNmcli(networks):
+        elapsed, latencies = _timed(wireless_scan, [None] * args.targets)
+    return elapsed, latencies, {"networks": args.networks}
+
+
+def bench_report(args):
+    from bench_report import synthetic_findings
+    from core.report import generate_pdf
+    findings = synthetic_findings(args.findings)
+    with tempfile.TemporaryDirectory() as tmp:
+        elapsed, latencies = _timed(lambda f: generate_pdf(f, filename=os.path.join(tmp, "b.pdf")),
+                                    [findings])
+    return elapsed, latencies, {"findings": args.findings,
+                                "findings_per_second": round(args.findings / elapsed, 1)}
+
+
+BANNERS = [
+    "SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.6\r\n",
+    "220 (vsFTPd 3.0.3)\r\n",
+    "220 mx.example.com ESMTP Exim 4.96 Tue, 01 Oct 2024 10:00:00 +0000\r\n",
+    "+OK Dovecot (Ubuntu) ready.\r\n",
+    "RFB 003.008\n",
+    "HTTP/1.1 200 OK\r\nServer: Apache/2.4.41 (Ubuntu) OpenSSL/1.1.1f\r\n"
+    "X-Powered-By: PHP/7.4.3\r\nContent-Type: text/html\r\n\r\n",
+    "HTTP/1.1 403 Forbidden\r\nServer: nginx/1.18.0\r\nContent-Length: 0\r\n\r\n",
+    "unrecognised service banner with no known product in it\r\n",
+]
+
+
+def bench_fingerprint(args):
+    # Per-banner matching cost as filler signatures (random literals, like a
+    # large vendor DB) are added to the built-in set
+    import json
+    import random
+    from core.fingerprint import BUILTIN_SIGNATURES, SignatureSet
+    with open(BUILTIN_SIGNATURES) as f:
+        builtin = json.load(f)["signatures"]
+    rng = random.Random(0)
+    sizes = sorted({len(builtin), *(n for n in (1000, 10000) if n < args.signatures), args.signatures})
+    per_match, naive, compile_seconds = {}, {}, {}
+    start = time.perf_counter()
+    latencies = []
+    for size in sizes:
+        filler = []
+        for i in range(size - len(builtin)):
+            word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8))
+            filler.append({"product": f"Product {i}", "service": "tcp", "literal": word,
+                           "pattern": word + r"[/ ](?P<version>[\d.]+)"})
+        t = time.perf_counter()
+        signatures = SignatureSet(builtin + filler)
+        compile_seconds[size] = round(time.perf_counter() - t, 3)
+
+        rounds = 200
+        t = time.perf_counter()
+        for _ in range(rounds):
+            for text in BANNERS:
+                signatures.match_banner(text)
+        seconds = (time.perf_counter() - t) / (rounds * len(BANNERS))
+        per_match[size] = round(seconds * 1e6, 2)
+        latencies.append(seconds)
+
+        # Every regex against every banner, for comparison
+        regexes = [regex for _, _, regex, _ in signatures.signatures]
+        t = time.perf_counter()
+        for text in BANNERS:
+            for regex in regexes:
+                regex.search(text)
+        naive[size] = round((time.perf_counter() - t) / len(BANNERS) * 1e6, 2)
+    return time.perf_counter() - start, latencies, {"signatures": sizes, "us_per_banner": per_match,
+                                                    "naive_us_per_banner": naive,
+                                                    "compile_seconds": compile_seconds}
+
+
+def run_one(name, args):
+    from core.metrics import enable_metrics
+    metrics = enable_metrics()
+    bench = globals()["bench_" + name.replace("-", "_")]
+    elapsed, latencies, params = bench(args)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+    probes = _probes(metrics)
+    latencies.sort()
+    return {
+        "benchmark": name,
+        "params": params,
+        "seconds": round(elapsed, 3),
+        "probes": probes,
+        "probes_per_second": round(probes / elapsed, 1) if elapsed else None,
+        "target_latency_p50": round(statistics.median(latencies), 4),
+        "target_latency_p95": round(latencies[int(0.95 * (len(latencies) - 1))], 4),
+        "peak_rss_mb": round(peak / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--ports", type=int, default=65535, help="Ports per port scan (1..N)")
+    parser.add_argument("--listeners", type=int, default=200, help="Open ports in the TCP farm")
+    parser.add_argument("--filtered", type=int, default=2000, help="Dropping ports for ports-filtered")
+    parser.add_argument("--targets", type=int, default=20, help="Targets per web/api/ad/tls/wireless run")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added HTTP stand-in latency (seconds)")
+    parser.add_argument("--networks", type=int, default=200, help="Networks listed by the fake nmcli")
+    parser.add_argument("--findings", type=int, default=10000, help="Findings for the report scenario")
+    parser.add_argument("--signatures", type=int, default=50000, help="Largest signature DB for fingerprint")
+    parser.add_argument("--out", help="Also write the results to this JSON file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Module output goes to /dev/null, only the JSON result to stdout
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run_one(args.child, args)
+        print(json.dumps(result))
+        return
+
+    results = []
+    child_args = []
+    for option in ("ports", "listeners", "filtered", "targets", "latency", "networks", "findings", "signatures"):
+        child_args += [f"--{option}", str(getattr(args, option))]
+    for name in args.scenarios.split(","):
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+        out = subprocess.run([sys.executable, __file__, "--child", name] + child_args,
+                             cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            result = {"benchmark": name, "error": out.stderr.strip().splitlines()[-1:]}
+        else:
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(json.dumps(result))
+        results.append(result)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Report rendering benchmark.
+
+Renders PDF reports for synthetic finding sets and prints one JSON object
+per size with wall time and peak RSS. Each size runs in a fresh child
+process so peak memory isn't inherited from the previous run.
+
+    python benchmarks/bench_report.py                 # 1k, 10k, 50k
+    python benchmarks/bench_report.py --sizes 1000 --out report_bench.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODULES = ["Web", "API", "AD", "Ports", "TLS", "Wireless"]
+SEVERITIES = ["Info", "Low", "Medium", "High", "Critical"]
+
+
+def synthetic_findings(count, seed=1):
+    from core.finding import Finding
+    rng = random.Random(seed)
+    findings = []
+    for i in range(count):
+        host = f"host{i % 2000}.example.internal"
+        f = Finding(
+            f"Missing header {i % 40}",
+            rng.choice(SEVERITIES),
+            # Mix short and long descriptions so both cell paths are exercised
+            f"{host}: header is not present" + (" because of a long explanation" * rng.randint(0, 6)),
+            "Configure the header properly on every virtual host"
+        )
+        f.module = rng.choice(MODULES)
+        findings.append(f)
+    return findings
+
+
+def run_one(count):
+    from core.report import generate_pdf
+    findings = synthetic_findings(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "bench.pdf")
+        start = time.perf_counter()
+        generate_pdf(findings, filename=filename)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(filename)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+    return {
+        "benchmark": "generate_pdf",
+        "findings": count,
+        "seconds": round(elapsed, 3),
+        "findings_per_second": round(count / elapsed, 1),
+        "peak_rss_mb": round(peak / 2**20, 1),
+        "pdf_bytes": size
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated finding counts")
+    parser.add_argument("--out", help="Also write the results to this JSON file")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Keep reportlab's progress line off the JSON stream
+        sys.stdout = sys.stderr
+        result = run_one(args.child)
+        sys.stdout = sys.__stdout__
+        print(json.dumps(result))
+        return
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        out = subprocess.run([sys.executable, __file__, "--child", str(size)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(json.dumps(result))
+        results.append(result)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+CLI startup benchmark.
+
+Runs each scenario in fresh interpreters and prints one JSON object per
+scenario: median wall time over --runs, the total import time reported
+by `python -X importtime`, the slowest imports, and which heavy packages
+got loaded at all.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --out startup_bench.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "help": ["main.py", "--help"],
+    "import-main": ["-c", "import main"],
+    "ports-module": ["-c", "import main; from core.registry import SCAN_MODULES; SCAN_MODULES.get('Ports')"],
+    "web-module": ["-c", "import main; from core.registry import SCAN_MODULES; SCAN_MODULES.get('Web')"],
+}
+
+# Packages that should only load when a run selects something that needs them
+HEAVY = ["reportlab", "requests", "urllib3", "rich.table", "rich.live", "rich.progress", "ssl"]
+
+
+def parse_importtime(stderr):
+    """Returns {module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative))
+    return modules
+
+
+def run_scenario(name, argv, runs, top):
+    cmd = [sys.executable] + argv
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, capture_output=True, check=True)
+        times.append(time.perf_counter() - start)
+
+    out = subprocess.run([sys.executable, "-X", "importtime"] + argv,
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = parse_importtime(out.stderr)
+    slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    return {
+        "benchmark": "startup",
+        "scenario": name,
+        "runs": runs,
+        "median_seconds": round(statistics.median(times), 4),
+        "import_seconds": round(sum(s for s, _ in modules.values()) / 1e6, 4),
+        "modules_imported": len(modules),
+        "slowest_cumulative_ms": {mod: round(cum / 1000, 1) for mod, (_, cum) in slowest},
+        "heavy_loaded": [pkg for pkg in HEAVY if pkg in modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per scenario")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--out", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.scenarios.split(","):
+        result = run_scenario(name, SCENARIOS[name], args.runs, args.top)
+        print(json.dumps(result))
+        results.append(result)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Local stand-in targets for the benchmarks: a TCP listener farm, ports
+that drop SYNs, a configurable HTTP server, TLS servers pinned to chosen protocol versions,
+and a fake nmcli. Everything binds to 127.0.0.1 and cleans up on exit.
+"""
+import json
+import os
+import shutil
+import socket
+import ssl
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class TCPFarm:
+    """`count` listening sockets on ephemeral ports; the kernel completes the handshakes."""
+
+    def __init__(self, count=100):
+        self.count = count
+        self.sockets = []
+        self.ports = []
+
+    def __enter__(self):
+        for _ in range(self.count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("127.0.0.1", 0))
+            s.listen(128)
+            self.sockets.append(s)
+            self.ports.append(s.getsockname()[1])
+        return self
+
+    def __exit__(self, *exc):
+        for s in self.sockets:
+            s.close()
+
+
+class BlackHoles:
+    """
+    `count` "filtered" ports: listeners with a backlog of zero whose queue is
+    already full, so the kernel drops further SYNs and connects time out.
+    """
+
+    def __init__(self, count=100):
+        self.count = count
+        self.sockets = []
+        self.ports = []
+
+    def __enter__(self):
+        for _ in range(self.count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("127.0.0.1", 0))
+            s.listen(0)
+            port = s.getsockname()[1]
+            filler = socket.create_connection(("127.0.0.1", port))
+            self.sockets += [s, filler]
+            self.ports.append(port)
+        return self
+
+    def __exit__(self, *exc):
+        for s in self.sockets:
+            s.close()
+
+
+class HTTPStandIn:
+    """
+    Threaded HTTP server with configurable response headers, Set-Cookie
+    values, per-path status codes and added latency. Answers GET and
+    OPTIONS; sends 304 when If-None-Match matches `etag`.
+    """
+
+    def __init__(self, headers=None, cookies=None, paths=None, latency=0.0, etag=None, body=b"ok"):
+        self.headers = headers or {}
+        self.cookies = cookies or []
+        self.paths = paths or {}
+        self.latency = latency
+        self.etag = etag
+        self.body = body
+        self.requests = 0
+
+    def __enter__(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, with_body):
+                standin.requests += 1
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if standin.etag and self.headers.get("If-None-Match") == standin.etag:
+                    self.send_response(304)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                path = self.path.split("?")[0]
+                status = standin.paths.get(path, 200 if path == "/" else 404)
+                self.send_response(status)
+                for name, value in standin.headers.items():
+                    self.send_header(name, value)
+                for cookie in standin.cookies:
+                    self.send_header("Set-Cookie", cookie)
+                if standin.etag:
+                    self.send_header("ETag", standin.etag)
+                body = standin.body if with_body else b""
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_OPTIONS(self):
+                self._respond(False)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def self_signed_cert(directory, days=30):
+    """Writes cert.pem/key.pem for localhost with the openssl CLI; returns their paths."""
+    if not shutil.which("openssl"):
+        raise RuntimeError("the openssl command is required for TLS stand-ins")
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key,
+                    "-out", cert, "-days", str(days), "-subj", "/CN=localhost"],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+class TLSStandIn:
+    """TLS server accepting only protocol versions min_version..max_version (ssl.TLSVersion names)."""
+
+    def __init__(self, cert, key, min_version="TLSv1_2", max_version="TLSv1_3", ciphers=None):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(cert, key)
+        legacy = getattr(ssl.TLSVersion, min_version) < ssl.TLSVersion.TLSv1_2
+        if ciphers or legacy:
+            # OpenSSL 3 refuses TLSv1 and TLSv1.1 above security level 0
+            self.context.set_ciphers((ciphers or "DEFAULT") + ":@SECLEVEL=0")
+        self.context.minimum_version = getattr(ssl.TLSVersion, min_version)
+        self.context.maximum_version = getattr(ssl.TLSVersion, max_version)
+        self.handshakes = 0
+
+    def __enter__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+        self.target = f"127.0.0.1:{self.port}"
+        self._stop = False
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def _serve(self):
+        while not self._stop:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handshake, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        conn.settimeout(5)
+        try:
+            with self.context.wrap_socket(conn, server_side=True):
+                self.handshakes += 1
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def __exit__(self, *exc):
+        self._stop = True
+        self.sock.close()
+
+
+FAKE_NMCLI = """#!{python}
+# Fake nmcli for benchmarks: prints the networks in $FAKE_NMCLI_NETWORKS
+import json, os, sys
+networks = json.load(open(os.environ["FAKE_NMCLI_NETWORKS"]))
+fields = ["SSID", "SECURITY", "SIGNAL"]
+if "-f" in sys.argv:
+    fields = sys.argv[sys.argv.index("-f") + 1].split(",")
+if "-t" in sys.argv:
+    esc = lambda v: str(v).replace("\\\\", "\\\\\\\\").replace(":", "\\\\:")
+    for n in networks:
+        print(":".join(esc(n.get(f, "")) for f in fields))
+else:
+    width = max([len(str(n.get(f, ""))) for n in networks for f in fields] + [8]) + 2
+    print("".join(f.ljust(width) for f in fields))
+    for n in networks:
+        print("".join(str(n.get(f, "")).ljust(width) for f in fields))
+"""
+
+
+class FakeNmcli:
+    """
+    Puts a fake `nmcli` first on PATH that lists `networks` (dicts with
+    SSID, SECURITY, SIGNAL, ... keys) in tabular or -t terse form.
+    """
+
+    def __init__(self, networks):
+        self.networks = networks
+
+    def __enter__(self):
+        self.dir = tempfile.mkdtemp(prefix="fake-nmcli-")
+        path = os.path.join(self.dir, "nmcli")
+        with open(path, "w") as f:
+            f.write(FAKE_NMCLI.format(python=sys.executable))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+        data = os.path.join(self.dir, "networks.json")
+        with open(data, "w") as f:
+            json.dump(self.networks, f)
+        self._env = {k: os.environ.get(k) for k in ("PATH", "FAKE_NMCLI_NETWORKS")}
+        os.environ["PATH"] = self.dir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["FAKE_NMCLI_NETWORKS"] = data
+        return self
+
+    def __exit__(self, *exc):
+        for key, value in self._env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,251 @@
+import asyncio
+import errno
+import threading
+from collections import deque
+from core.config_loader import load_config
+
+# Outcome signals fed back to the limiter
+SUCCESS, CONGESTION, LOCAL, NEUTRAL = "success", "congestion", "local", "neutral"
+
+# Errors that mean this machine is out of sockets/buffers, not that the target is struggling
+LOCAL_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL, errno.ENOMEM}
+
+# HTTP statuses that ask us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+
+def signal_for(exc=None, status=None):
+    """Maps a probe's exception or HTTP status to a limiter signal."""
+    if exc is None:
+        return CONGESTION if status in THROTTLE_STATUSES else SUCCESS
+    if isinstance(exc, OSError) and exc.errno in LOCAL_ERRNOS:
+        return LOCAL
+    if isinstance(exc, ConnectionRefusedError):
+        return SUCCESS  # a fast, definite answer
+    # requests' ConnectTimeout/ReadTimeout/ConnectionError wrap the socket error
+    if isinstance(exc, (TimeoutError, ConnectionResetError)) or type(exc).__name__.endswith("Timeout"):
+        return CONGESTION
+    if "reset by peer" in str(exc).lower():
+        return CONGESTION
+    return NEUTRAL
+
+
+class AIMD:
+    """
+    Additive-increase/multiplicative-decrease window. It grows by one per
+    success until the first cut (slow start), then by one per window of
+    successes; a cut multiplies it by `decrease`. Probes issued before a
+    cut can't cut again, so one burst of timeouts counts as one event.
+    """
+
+    __slots__ = ("limit", "minimum", "maximum", "decrease", "epoch", "slow_start")
+
+    def __init__(self, initial, minimum=1, maximum=None, decrease=0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = maximum or initial
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.epoch = 0
+        self.slow_start = True
+
+    def grow(self):
+        step = 1.0 if self.slow_start else 1.0 / self.limit
+        self.limit = min(self.maximum, self.limit + step)
+
+    def cut(self, epoch):
+        if epoch < self.epoch:
+            return False
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.epoch += 1
+        self.slow_start = False
+        return True
+
+
+class Ticket:
+    __slots__ = ("key", "epoch", "global_epoch")
+
+    def __init__(self, key, epoch, global_epoch):
+        self.key = key
+        self.epoch = epoch
+        self.global_epoch = global_epoch
+
+
+class _Window:
+    __slots__ = ("aimd", "inflight")
+
+    def __init__(self, aimd):
+        self.aimd = aimd
+        self.inflight = 0
+
+
+class AdaptiveLimiter:
+    """
+    In-flight probe limits per (host, kind) plus one global limit, each an
+    AIMD window. Host windows back off on timeouts, resets and 429/503;
+    the global window backs off when this machine runs out of sockets.
+    Threads block in acquire(); coroutines await acquire_async().
+
+    `kinds` maps a probe kind ("tcp", "http") to its initial, min and max
+    per-host window.
+    """
+
+    def __init__(self, kinds, global_initial=2048, global_min=64, global_max=8192, decrease=0.5):
+        self.kinds = kinds
+        self.decrease = decrease
+        self._global = AIMD(global_initial, global_min, global_max, decrease)
+        self._inflight = 0
+        self._windows = {}
+        self._waiters = {}
+        self._blocked = 0
+        self._cond = threading.Condition()
+
+    def _window(self, key):
+        window = self._windows.get(key)
+        if window is None:
+            cfg = self.kinds[key[1]]
+            window = self._windows[key] = _Window(
+                AIMD(cfg["initial"], cfg["min"], cfg["max"], self.decrease))
+        return window
+
+    def _try_acquire(self, key):
+        window = self._windows.get(key) or self._window(key)
+        # inflight + 1 <= limit: a window of 2.5 allows two probes
+        if window.inflight + 1 <= window.aimd.limit and self._inflight + 1 <= self._global.limit:
+            window.inflight += 1
+            self._inflight += 1
+            return Ticket(key, window.aimd.epoch, self._global.epoch)
+        return None
+
+    def try_acquire(self, host, kind):
+        """Returns a Ticket if a slot is free right now, else None."""
+        with self._cond:
+            return self._try_acquire((host, kind))
+
+    def acquire(self, host, kind):
+        key = (host, kind)
+        with self._cond:
+            while True:
+                ticket = self._try_acquire(key)
+                if ticket:
+                    return ticket
+                self._blocked += 1
+                try:
+                    self._cond.wait()
+                finally:
+                    self._blocked -= 1
+
+    async def acquire_async(self, host, kind):
+        key = (host, kind)
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                ticket = self._try_acquire(key)
+                if ticket:
+                    return ticket
+                waiter = loop.create_future()
+                self._waiters.setdefault(key, deque()).append((loop, waiter))
+            await waiter
+
+    def release(self, ticket, signal=NEUTRAL):
+        with self._cond:
+            window = self._windows[ticket.key]
+            window.inflight -= 1
+            self._inflight -= 1
+            if signal == SUCCESS:
+                window.aimd.grow()
+                self._global.grow()
+            elif signal == CONGESTION:
+                window.aimd.cut(ticket.epoch)
+            elif signal == LOCAL:
+                self._global.cut(ticket.global_epoch)
+            if self._blocked:
+                self._cond.notify_all()
+            if self._waiters:
+                self._wake(ticket.key)
+
+    def _wake(self, key):
+        # Wake a waiter for the released host, and one for any other host
+        # in case the global window was the bottleneck
+        for k in (key, next((k for k, q in self._waiters.items() if q and k != key), None)):
+            queue = self._waiters.get(k)
+            while queue:
+                loop, waiter = queue.popleft()
+                if not waiter.done():
+                    loop.call_soon_threadsafe(_settle, waiter)
+                    break
+            if queue is not None and not queue:
+                del self._waiters[k]
+
+    def slot(self, host, kind):
+        """Context manager holding one slot; exceptions are fed back as signals."""
+        return Slot(self, host, kind)
+
+    def limits(self, host, kind):
+        """Current (host window, global window) limits, for display."""
+        with self._cond:
+            return self._window((host, kind)).aimd.limit, self._global.limit
+
+
+def _settle(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class Slot:
+    __slots__ = ("limiter", "host", "kind", "ticket", "signal")
+
+    def __init__(self, limiter, host, kind):
+        self.limiter = limiter
+        self.host = host
+        self.kind = kind
+        self.signal = None
+
+    def status(self, code):
+        """Reports an HTTP status; 429/503 back the host off."""
+        self.signal = signal_for(status=code)
+
+    def __enter__(self):
+        self.ticket = self.limiter.acquire(self.host, self.kind)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        signal = signal_for(exc) if exc is not None else (self.signal or SUCCESS)
+        self.limiter.release(self.ticket, signal)
+        return False
+
+
+class _NullSlot:
+    def status(self, code):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SLOT = _NullSlot()
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Returns the process-wide AdaptiveLimiter, or None when config adaptive.enabled is off."""
+    global _limiter
+    if _limiter is None:
+        cfg = load_config()["adaptive"]
+        if not cfg["enabled"]:
+            return None
+        with _limiter_lock:
+            if _limiter is None:
+                g = cfg["global"]
+                _limiter = AdaptiveLimiter({"tcp": cfg["tcp"], "http": cfg["http"]},
+                                           g["initial"], g["min"], g["max"], cfg["decrease"])
+    return _limiter
+
+
+def slot(host, kind):
+    """A limiter slot for one probe against host; a no-op when adaptive control is off."""
+    limiter = get_limiter()
+    return _NULL_SLOT if limiter is None else limiter.slot(host, kind)
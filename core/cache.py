@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from core.config_loader import load_config
+
+
+class ResultCache:
+    """
+    Persistent per-check result cache in SQLite, keyed by (module, target,
+    check). Each entry has an expiry and an optional validator (ETag,
+    certificate fingerprint, ...); a hit requires both to still hold.
+
+    The same database records the findings of the latest runs
+    (cache.keep_runs) so a scan can be diffed against the previous one.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                module TEXT, target TEXT, check_id TEXT,
+                validator TEXT, value TEXT, expires REAL, updated REAL,
+                PRIMARY KEY (module, target, check_id)
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT, finished REAL
+            );
+            CREATE TABLE IF NOT EXISTS run_findings (
+                run_id INTEGER, key TEXT, finding TEXT
+            );
+            CREATE INDEX IF NOT EXISTS run_findings_run ON run_findings (run_id);
+        """)
+        self._db.commit()
+
+    def ttl(self, check):
+        """TTL in seconds for a check type, e.g. "web.paths" falls back to "web"."""
+        ttls = load_config()["cache"]["ttl"]
+        while check:
+            if check in ttls:
+                return ttls[check]
+            check = check.rpartition(".")[0]
+        return ttls.get("default", 86400)
+
+    def lookup(self, module, target, check):
+        """Returns (value, validator) for a fresh entry, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, validator, expires FROM results WHERE module=? AND target=? AND check_id=?",
+                (module, str(target), check)).fetchone()
+        if row is None or row[2] < time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get(self, module, target, check, validator=None):
+        """Returns the cached value if it is fresh and its validator matches."""
+        hit = self.lookup(module, target, check)
+        if hit is None or (validator is not None and hit[1] != validator):
+            return None
+        return hit[0]
+
+    def put(self, module, target, check, value, validator=None, ttl=None):
+        now = time.time()
+        ttl = self.ttl(check) if ttl is None else ttl
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (module, str(target), check, validator, json.dumps(value), now + ttl, now))
+            self._db.commit()
+
+    def last_run(self):
+        """Returns {key: finding dict} for the most recent recorded run."""
+        with self._lock:
+            row = self._db.execute("SELECT MAX(run_id) FROM runs").fetchone()
+            if row[0] is None:
+                return {}
+            rows = self._db.execute(
+                "SELECT key, finding FROM run_findings WHERE run_id=?", (row[0],)).fetchall()
+        return {key: json.loads(finding) for key, finding in rows}
+
+    def record_run(self, findings):
+        """
+        Stores the keys of this run's findings and returns the new run id.
+        Runs older than the last cache.keep_runs are deleted.
+        """
+        with self._lock:
+            cur = self._db.execute("INSERT INTO runs (finished) VALUES (?)", (time.time(),))
+            run_id = cur.lastrowid
+            self._db.executemany(
+                "INSERT INTO run_findings VALUES (?, ?, ?)",
+                ((run_id, finding_key(f), json.dumps(f.to_dict())) for f in findings))
+            oldest = run_id - load_config()["cache"]["keep_runs"]
+            self._db.execute("DELETE FROM run_findings WHERE run_id <= ?", (oldest,))
+            self._db.execute("DELETE FROM runs WHERE run_id <= ?", (oldest,))
+            self._db.commit()
+        return run_id
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def finding_key(finding):
+    """Identity of a finding across runs: same module, target, check and title."""
+    return "\x1f".join(str(v) for v in (finding.module, finding.target, finding.check_id, finding.title))
+
+
+def in_scope(data, scanned):
+    """
+    Whether a finding dict falls under the (module, target) jobs of a run.
+    Jobs on "local" cover every target of their module: host-local modules
+    report targets of their own (e.g. Wi-Fi BSSIDs).
+    """
+    module = data.get("module")
+    return (module, str(data.get("target"))) in scanned or (module, "local") in scanned
+
+
+def diff_runs(previous, findings, scanned=None):
+    """
+    Compares this run's findings against a previous run's {key: dict} and
+    returns (new findings, resolved finding dicts). With `scanned`, a set
+    of (module, target) jobs this run completed, only previous findings of
+    those jobs can be resolved.
+    """
+    seen = set()
+    new = []
+    for f in findings:
+        key = finding_key(f)
+        seen.add(key)
+        if key not in previous:
+            new.append(f)
+    resolved = [data for key, data in previous.items()
+                if key not in seen and (scanned is None or in_scope(data, scanned))]
+    return new, resolved
+
+
+_cache = None
+
+
+def enable_cache(path=None):
+    global _cache
+    if _cache is None:
+        _cache = ResultCache(path or load_config()["cache"]["path"])
+    return _cache
+
+
+def get_cache():
+    """Returns the active ResultCache, or None when incremental scanning is off."""
+    return _cache
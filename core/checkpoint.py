@@ -0,0 +1,125 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from core.finding import Finding
+
+
+class Checkpoint:
+    """
+    Records the completed (module, target) jobs of a CLI run, with their
+    findings, in SQLite so an interrupted run can be resumed.
+
+    Completions are buffered and committed every `batch_size` jobs or
+    `interval` seconds, whichever comes first: a crash only re-runs the
+    jobs of the last uncommitted batch.
+    """
+
+    def __init__(self, path, run_id=None, options=None, batch_size=20, interval=10.0):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY, options TEXT, started REAL, finished REAL
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                run_id TEXT, module TEXT, target TEXT, findings TEXT, completed REAL,
+                PRIMARY KEY (run_id, module, target)
+            );
+        """)
+
+        if run_id is None:
+            self.run_id = self._new_run_id()
+            self.options = options or {}
+            self._db.execute("INSERT INTO runs VALUES (?, ?, ?, NULL)",
+                             (self.run_id, json.dumps(self.options), time.time()))
+            self._db.commit()
+            self._done = set()
+        else:
+            row = self._db.execute("SELECT options FROM runs WHERE run_id=?", (run_id,)).fetchone()
+            if row is None:
+                self._db.close()
+                raise ValueError(f"no checkpointed run {run_id!r} in {path}")
+            self.run_id = run_id
+            self.options = json.loads(row[0])
+            self._done = set(self._db.execute(
+                "SELECT module, target FROM jobs WHERE run_id=?", (run_id,)).fetchall())
+
+    def _new_run_id(self):
+        base = datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_id, n = base, 1
+        while self._db.execute("SELECT 1 FROM runs WHERE run_id=?", (run_id,)).fetchone():
+            n += 1
+            run_id = f"{base}_{n}"
+        return run_id
+
+    def is_done(self, module, target):
+        return (module, str(target)) in self._done
+
+    def done(self, module, target, findings):
+        """Marks a job completed; committed with the next batch."""
+        row = (self.run_id, module, str(target),
+               json.dumps([f.to_dict() for f in findings if isinstance(f, Finding)]), time.time())
+        with self._lock:
+            self._done.add((module, str(target)))
+            self._pending.append(row)
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_commit >= self.interval):
+                self._commit()
+
+    def _commit(self):
+        if self._pending:
+            self._db.executemany("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?)", self._pending)
+            self._db.commit()
+            self._pending = []
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def __len__(self):
+        return len(self._done)
+
+    def completed(self):
+        """The (module, target) jobs of this run completed so far, targets as text."""
+        with self._lock:
+            return set(self._done)
+
+    def findings(self):
+        """Yields the findings of every committed job of this run."""
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT findings FROM jobs WHERE run_id=?", (self.run_id,)).fetchall()
+        for (data,) in rows:
+            for d in json.loads(data):
+                yield Finding.from_dict(d)
+
+    def finish(self):
+        with self._lock:
+            self._commit()
+            self._db.execute("UPDATE runs SET finished=? WHERE run_id=?", (time.time(), self.run_id))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._commit()
+            finally:
+                self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
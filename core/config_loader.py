@@ -1,21 +1,270 @@
 import json
 import os
+import signal
+import threading
+import time
+from types import MappingProxyType
 
 DEFAULT_CONFIG = {
     "threads": 5,
+    "per_host": 2,
     "timeout": 5,
-    "report_format": "pdf"
+    "report_format": "pdf,json",
+    "dns": {"ttl": 300, "negative_ttl": 30, "prefetch": True},
+    "http": {
+        "user_agent": "Mozilla/5.0 (compatible; Kryphorix Scanner)",
+        "pool_connections": 256,
+        "pool_maxsize": 8
+    },
+    # Per-module settings. rate_limit is probes per second per target (0 = unlimited)
+    "modules": {
+        "web": {"timeout": 10, "path_timeout": 5, "tls_timeout": 5, "threads": 5, "rate_limit": 0},
+        "api": {"timeout": 10, "options_timeout": [10, 30], "path_timeout": 5, "threads": 4, "rate_limit": 0},
+        "ports": {"timeout": 2, "concurrency": 500, "rate_limit": 0},
+        "tls": {"timeout": 5, "concurrency": 8},
+        "ad": {"timeout": 3},
+        # nmcli timeout; --wifi-monitor polls every `interval` seconds and reports
+        # an AP as gone after `grace` polls without it
+        "wireless": {"timeout": 30, "interval": 30, "grace": 2}
+    },
+    # Incremental scanning: result cache location and per-check TTLs in seconds.
+    # Keys are matched most specific first ("web.paths", then "web", then "default").
+    # keep_runs is how many recorded runs keep their findings for --diff
+    "cache": {
+        "enabled": False,
+        "path": "cache/results.db",
+        "keep_runs": 1,
+        "ttl": {"default": 86400, "ports": 43200, "tls.enum": 604800}
+    },
+    # Probe instrumentation (also enabled by --metrics-out/--trace-out); trace_limit caps trace events
+    "metrics": {"enabled": False, "trace_limit": 100000},
+    # Plugins: default per-call timeout (seconds) and how many KIND = "cpu" calls run
+    # at once, each in a process of its own (0 = CPU count)
+    "plugins": {"timeout": 60, "processes": 0},
+    # Resumable runs: completed jobs are committed every batch_size jobs or interval seconds
+    "checkpoint": {"path": "state/checkpoints.db", "batch_size": 20, "interval": 10},
+    # AIMD concurrency: per-host windows for "tcp" (ports, AD) and "http" probes,
+    # plus a global window that shrinks when local sockets run out
+    "adaptive": {
+        "enabled": True,
+        "decrease": 0.5,
+        "global": {"initial": 2048, "min": 64, "max": 8192},
+        "tcp": {"initial": 500, "min": 16, "max": 2000},
+        "http": {"initial": 8, "min": 1, "max": 64}
+    },
+    # Per-host connect timeouts from measured RTT (SRTT + k*RTTVAR, at least
+    # min_timeout); configured timeouts become the ceiling. Probes that time out
+    # below the ceiling are retried up to `retries` times with doubled timeouts
+    "rtt": {"enabled": True, "min_timeout": 0.1, "k": 4, "retries": 1},
+    # Run-wide (host, port) state table shared by ports, discovery, AD and TLS;
+    # states are reused for ttl seconds instead of connecting again
+    "portstate": {"enabled": True, "ttl": 600},
+    # Liveness pre-pass (also enabled by --discover): hosts that answer on none of
+    # these ports (or their target's own port) within timeout are skipped
+    "discovery": {
+        "enabled": False,
+        "ports": [80, 443, 22, 445, 3389, 135, 139, 53, 25, 8080],
+        "timeout": 1.5,
+        "concurrency": 64
+    },
+    # Coordinator/worker mode: a worker's jobs are requeued after `lease` seconds
+    # without a heartbeat; a job is failed after losing max_attempts workers
+    "distributed": {"lease": 60, "heartbeat": 10, "token": "", "max_attempts": 3},
+    # Service fingerprinting: port scans read up to banner_bytes from each open
+    # port they find, spending at most banner_timeout seconds; `signatures`
+    # lists extra signature files loaded after core/signatures.json
+    "fingerprint": {"banners": True, "banner_timeout": 1, "banner_bytes": 2048, "signatures": []}
 }
 
-def load_config(path="config.json"):
-    if not os.path.exists(path):
-        print("[!] config.json not found. Using default settings.")
-        return DEFAULT_CONFIG
+# How often (seconds) the config file's mtime is checked for changes
+CHECK_INTERVAL = 1.0
 
+_snapshot = None
+_path = None
+_mtime = None
+_checked = 0.0
+_lock = threading.Lock()
+
+
+def _merge(base, override):
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_timeout(name, value):
+    values = value if isinstance(value, (list, tuple)) else [value]
+    if not values or not all(_is_number(v) and v > 0 for v in values):
+        raise ValueError(f"{name} must be a positive number")
+
+
+def validate_config(config):
+    """Raises ValueError if a known setting has the wrong type or range."""
+    for key in ("threads", "per_host"):
+        if not isinstance(config.get(key), int) or config[key] < 1:
+            raise ValueError(f"{key} must be a positive integer")
+    _check_timeout("timeout", config.get("timeout"))
+
+    for module, section in config.get("modules", {}).items():
+        if not isinstance(section, dict):
+            raise ValueError(f"modules.{module} must be an object")
+        for key, value in section.items():
+            name = f"modules.{module}.{key}"
+            if key.endswith("timeout"):
+                _check_timeout(name, value)
+            elif key == "interval":
+                _check_timeout(name, value)
+            elif key in ("threads", "concurrency", "grace"):
+                if not isinstance(value, int) or value < 1:
+                    raise ValueError(f"{name} must be a positive integer")
+            elif key == "rate_limit":
+                if not _is_number(value) or value < 0:
+                    raise ValueError(f"{name} must be a number >= 0")
+
+    keep_runs = config.get("cache", {}).get("keep_runs", 1)
+    if not isinstance(keep_runs, int) or keep_runs < 1:
+        raise ValueError("cache.keep_runs must be a positive integer")
+    for check, ttl in config.get("cache", {}).get("ttl", {}).items():
+        if not _is_number(ttl) or ttl < 0:
+            raise ValueError(f"cache.ttl.{check} must be a number >= 0")
+
+    adaptive = config.get("adaptive", {})
+    if "decrease" in adaptive and not (_is_number(adaptive["decrease"]) and 0 < adaptive["decrease"] < 1):
+        raise ValueError("adaptive.decrease must be between 0 and 1")
+    for kind in ("global", "tcp", "http"):
+        window = adaptive.get(kind, {})
+        if not all(isinstance(window.get(k), int) and window[k] >= 1 for k in ("initial", "min", "max")):
+            raise ValueError(f"adaptive.{kind} initial, min and max must be positive integers")
+        if not window["min"] <= window["initial"] <= window["max"]:
+            raise ValueError(f"adaptive.{kind} must satisfy min <= initial <= max")
+
+    rtt = config.get("rtt", {})
+    _check_timeout("rtt.min_timeout", rtt.get("min_timeout"))
+    if not _is_number(rtt.get("k")) or rtt["k"] <= 0:
+        raise ValueError("rtt.k must be a positive number")
+    if not isinstance(rtt.get("retries"), int) or rtt["retries"] < 0:
+        raise ValueError("rtt.retries must be an integer >= 0")
+
+    _check_timeout("portstate.ttl", config.get("portstate", {}).get("ttl"))
+
+    discovery = config.get("discovery", {})
+    _check_timeout("discovery.timeout", discovery.get("timeout"))
+    ports = discovery.get("ports")
+    if not ports or not all(isinstance(p, int) and 1 <= p <= 65535 for p in ports):
+        raise ValueError("discovery.ports must be a non-empty list of ports")
+    if not isinstance(discovery.get("concurrency"), int) or discovery["concurrency"] < 1:
+        raise ValueError("discovery.concurrency must be a positive integer")
+
+    distributed = config.get("distributed", {})
+    _check_timeout("distributed.lease", distributed.get("lease"))
+    _check_timeout("distributed.heartbeat", distributed.get("heartbeat"))
+    if distributed["heartbeat"] >= distributed["lease"]:
+        raise ValueError("distributed.heartbeat must be shorter than distributed.lease")
+
+    fingerprint = config.get("fingerprint", {})
+    _check_timeout("fingerprint.banner_timeout", fingerprint.get("banner_timeout"))
+    if not isinstance(fingerprint.get("banner_bytes"), int) or fingerprint["banner_bytes"] < 1:
+        raise ValueError("fingerprint.banner_bytes must be a positive integer")
+    if not all(isinstance(path, str) for path in fingerprint.get("signatures", [])):
+        raise ValueError("fingerprint.signatures must be a list of file paths")
+
+
+def _read(path):
+    """Returns the merged and validated config, or None if the file is unusable."""
     try:
         with open(path, "r") as f:
-            return json.load(f)
+            config = _merge(DEFAULT_CONFIG, json.load(f))
+        validate_config(config)
+        return config
     except json.JSONDecodeError:
-        print("[!] config.json is invalid. Using default settings.")
-        return DEFAULT_CONFIG
+        print("[!] config.json is invalid.")
+    except ValueError as e:
+        print(f"[!] config.json rejected: {e}")
+    return None
+
+
+def _mtime_of(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def reload_config(path=None):
+    """
+    Re-reads the config file and swaps in a new snapshot. A broken file
+    keeps the previous snapshot (or the defaults on first load).
+    """
+    global _snapshot, _path, _mtime, _checked
+    with _lock:
+        path = path or _path or "config.json"
+        mtime = _mtime_of(path)
+        if mtime is None:
+            print("[!] config.json not found. Using default settings.")
+            config = DEFAULT_CONFIG
+        else:
+            config = _read(path)
+
+        if config is not None:
+            _snapshot = _freeze(config)
+        elif _snapshot is not None and path == _path:
+            print("[!] Keeping previous settings.")
+        else:
+            print("[!] Using default settings.")
+            _snapshot = _freeze(DEFAULT_CONFIG)
+
+        _path, _mtime, _checked = path, mtime, time.monotonic()
+        return _snapshot
+
+
+def load_config(path=None):
+    """
+    Returns the cached, read-only configuration snapshot. The file is only
+    parsed again when it changes on disk (checked at most once per
+    CHECK_INTERVAL) or on an explicit reload_config()/SIGHUP.
+    """
+    global _checked
+    path = path or _path or "config.json"
+    if _snapshot is None or path != _path:
+        return reload_config(path)
+
+    now = time.monotonic()
+    if now - _checked >= CHECK_INTERVAL:
+        _checked = now
+        if _mtime_of(path) != _mtime:
+            return reload_config(path)
+    return _snapshot
+
+
+def module_config(name):
+    """Returns the settings section for one scan module."""
+    return load_config()["modules"].get(name, MappingProxyType({}))
+
+
+def _on_sighup(signum, frame):
+    # Only mark the snapshot stale; the next load_config() call does the
+    # actual reload outside the signal handler
+    global _mtime, _checked
+    _mtime, _checked = -1, float("-inf")
+
 
+def watch_config():
+    """Reloads the configuration on SIGHUP (main thread, POSIX only)."""
+    if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGHUP, _on_sighup)
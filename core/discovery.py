@@ -0,0 +1,74 @@
+import asyncio
+import threading
+from urllib.parse import urlparse
+from core.config_loader import load_config
+
+# host -> True/False, for the rest of the run
+_alive = {}
+_lock = threading.Lock()
+
+
+def target_port(target):
+    """The port a URL or host:port target names (scheme default for URLs), or None."""
+    target = str(target)
+    parsed = urlparse(target if "://" in target else "//" + target)
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    return port or {"http": 80, "https": 443}.get(parsed.scheme)
+
+
+async def _ping_hosts(hosts, timeout, concurrency):
+    # Loaded here: scan modules import core, not the other way round
+    from modules.ports import scan_ports, FILTERED
+    gate = asyncio.Semaphore(concurrency)
+
+    async def ping(host, ports):
+        async with gate:
+            try:
+                states = await scan_ports(host, ports, concurrency=len(ports), timeout=timeout,
+                                          check="discovery.connect")
+            except OSError:
+                return host, False  # unresolvable
+        # A RST proves the host is there as much as a SYN-ACK does
+        return host, any(state != FILTERED for state in states.values())
+
+    return dict(await asyncio.gather(*(ping(host, ports) for host, ports in hosts.items())))
+
+
+def discover(targets):
+    """
+    Liveness pre-pass: connects to a few common ports (config
+    discovery.ports) plus each target's own port on every host in parallel.
+    A host that answers on any of them, even with a RST, is up. Answers
+    also seed the host's RTT estimate. Results are kept for the run, so
+    only hosts not seen yet are probed.
+
+    `targets` is an iterable of (host, port or None); returns {host: alive}.
+    """
+    cfg = load_config()["discovery"]
+    targets = list(targets)
+    hosts = {}
+    for host, port in targets:
+        if host not in _alive:
+            hosts.setdefault(host, set(cfg["ports"]))
+            if port:
+                hosts[host].add(port)
+
+    if hosts:
+        found = asyncio.run(_ping_hosts({h: sorted(p) for h, p in hosts.items()},
+                                        cfg["timeout"], cfg["concurrency"]))
+        with _lock:
+            _alive.update(found)
+    return {host: _alive[host] for host, _ in targets}
+
+
+def is_alive(host):
+    """Discovery result for host: True, False, or None if it wasn't probed."""
+    return _alive.get(host)
+
+
+def clear():
+    with _lock:
+        _alive.clear()
@@ -0,0 +1,393 @@
+"""
+Coordinator/worker mode. The coordinator leases (module, target) jobs to
+workers over TCP or a Unix socket and collects their findings; workers
+run the same module functions as a local scan.
+
+Messages are JSON objects, one per line:
+
+    worker -> coordinator   {"op": "hello", "name", "slots", "token"}
+                            {"op": "heartbeat"}
+                            {"op": "result", "id", "findings": [...]}
+                            {"op": "error", "id", "error"}
+    coordinator -> worker   {"op": "welcome", "options", "heartbeat"}
+                            {"op": "job", "id", "module", "target"}
+                            {"op": "bye", "reason"}
+
+A worker's leases last while it keeps sending heartbeats. When a worker
+disconnects or goes quiet for `lease` seconds, its jobs go back on the
+queue; a job that has lost `max_attempts` workers is failed instead. A
+peer that sends a malformed message is disconnected the same way.
+
+Workers receive the target list and their findings are trusted, so the
+coordinator only listens beyond loopback when a token is configured.
+"""
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from core.finding import Finding
+
+
+def parse_address(text):
+    """"host:port" or "unix:/path" -> (family, address)."""
+    if text.startswith("unix:"):
+        return socket.AF_UNIX, text[5:]
+    host, _, port = text.rpartition(":")
+    return socket.AF_INET6 if ":" in host.strip("[]") else socket.AF_INET, (host.strip("[]") or "0.0.0.0", int(port))
+
+
+def is_local(address):
+    """Whether a --listen address only accepts connections from this host."""
+    family, address = parse_address(address)
+    if family == socket.AF_UNIX or address[0] == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(address[0]).is_loopback
+    except ValueError:
+        return False
+
+
+def check_listen(address, token):
+    """Raises ValueError for a listen address reachable from other hosts without a token."""
+    if not token and not is_local(address):
+        raise ValueError(f"refusing to listen on {address} without a token "
+                         f"(set --token or distributed.token, or listen on 127.0.0.1)")
+
+
+def _validate(message):
+    # Raises ValueError unless message is a well-formed worker message
+    if not isinstance(message, dict):
+        raise ValueError("message is not an object")
+    op = message.get("op")
+    if op == "hello":
+        slots = message.get("slots", 1)
+        if not isinstance(message.get("token", ""), str) or type(slots) is not int or slots < 1:
+            raise ValueError("malformed hello")
+    elif op in ("result", "error"):
+        if type(message.get("id")) is not int:
+            raise ValueError("job id is not an integer")
+        findings = message.get("findings", [])
+        if not isinstance(findings, list) or not all(isinstance(f, dict) for f in findings):
+            raise ValueError("findings are not a list of objects")
+    elif op != "heartbeat":
+        raise ValueError(f"unknown op {op!r}")
+
+
+def _send(sock, lock, message):
+    data = (json.dumps(message) + "\n").encode()
+    with lock:
+        sock.sendall(data)
+
+
+class _Worker:
+    __slots__ = ("id", "name", "sock", "lock", "slots", "active", "seen")
+
+    def __init__(self, wid, sock):
+        self.id = wid
+        self.name = None
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.slots = 0
+        self.active = set()
+        self.seen = time.monotonic()
+
+
+class Coordinator:
+    """
+    Serves jobs to `main.py --worker` processes. run(jobs) yields
+    (job, findings, error) as results arrive, like Scheduler.run(); the
+    per-host cap applies across all workers. `options` are the scan
+    options workers rebuild the job functions from.
+
+    Used as a context manager it listens once and keeps its workers across
+    several run() calls, saying bye on exit; otherwise each run() is a
+    session of its own.
+    """
+
+    def __init__(self, address, options, lease=60, heartbeat=10, token="", max_attempts=3):
+        check_listen(address, token)
+        self.address = address
+        self.options = options
+        self.lease = lease
+        self.heartbeat = heartbeat
+        self.token = token
+        self.max_attempts = max_attempts
+        self._events = queue.Queue()
+        self._workers = {}
+        self._next_worker = 0
+        self._next_job = 0
+        self._listener = None
+
+    def __enter__(self):
+        self._listener = self._listen()
+        threading.Thread(target=self._accept, args=(self._listener,), daemon=True).start()
+        print(f"[*] Coordinator listening on {self.address}, waiting for workers")
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __call__(self, jobs, threads=None, per_host=2):
+        return self.run(jobs, threads, per_host)
+
+    def close(self):
+        """Says bye to the workers and stops listening."""
+        if self._listener is None:
+            return
+        # shutdown() wakes the accept thread so the address is released
+        try:
+            self._listener.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._listener.close()
+        self._listener = None
+        for worker in list(self._workers.values()):
+            try:
+                _send(worker.sock, worker.lock, {"op": "bye", "reason": "done"})
+                worker.sock.close()
+            except OSError:
+                pass
+        self._workers.clear()
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)
+
+    def _listen(self):
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)
+        listener = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(address)
+        listener.listen(64)
+        return listener
+
+    def _accept(self, listener):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return  # listener closed
+            self._next_worker += 1
+            worker = _Worker(self._next_worker, sock)
+            threading.Thread(target=self._read, args=(worker,), daemon=True).start()
+
+    def _read(self, worker):
+        # Reader threads only parse; all state lives in run()'s thread
+        try:
+            with worker.sock.makefile("r", encoding="utf-8") as lines:
+                for line in lines:
+                    self._events.put((worker, json.loads(line)))
+        except (OSError, ValueError):
+            pass
+        self._events.put((worker, None))
+
+    def run(self, jobs, threads=None, per_host=2):
+        if self._listener is None:
+            with self:
+                yield from self.run(jobs, threads, per_host)
+            return
+        # Ids stay unique across the session's runs
+        jobs = dict(enumerate(jobs, self._next_job))
+        self._next_job += len(jobs)
+        queues = OrderedDict()
+        for jid, job in jobs.items():
+            queues.setdefault(job.host, deque()).append(jid)
+        attempts = {}
+        host_active = {}
+        owner = {}
+
+        print(f"[*] Coordinator: {len(jobs)} jobs for {len(self._workers)} workers")
+
+        def dispatch():
+            # One job per host per pass, like the local scheduler
+            for worker in list(self._workers.values()):
+                while len(worker.active) < worker.slots and queues:
+                    for host in list(queues):
+                        if host_active.get(host, 0) < per_host:
+                            break
+                    else:
+                        return
+                    jid = queues[host].popleft()
+                    if not queues[host]:
+                        del queues[host]
+                    else:
+                        queues.move_to_end(host)
+                    job = jobs[jid]
+                    worker.active.add(jid)
+                    owner[jid] = worker
+                    host_active[host] = host_active.get(host, 0) + 1
+                    try:
+                        _send(worker.sock, worker.lock,
+                              {"op": "job", "id": jid, "module": job.module, "target": job.target})
+                    except OSError:
+                        break  # its reader reports the disconnect
+
+        def finish(jid):
+            job = jobs[jid]
+            owner.pop(jid).active.discard(jid)
+            host_active[job.host] -= 1
+            return job
+
+        def drop(worker, reason):
+            # Requeue the worker's leases in front of their hosts' queues
+            if self._workers.pop(worker.id, None) is None:
+                try:
+                    worker.sock.close()
+                except OSError:
+                    pass
+                return []
+            print(f"[!] Worker {worker.name or worker.id} lost ({reason}): "
+                  f"requeueing {len(worker.active)} jobs")
+            failed = []
+            for jid in list(worker.active):
+                job = finish(jid)
+                attempts[jid] = attempts.get(jid, 0) + 1
+                if attempts[jid] >= self.max_attempts:
+                    failed.append((job, [], RuntimeError(f"lost {attempts[jid]} workers ({reason})")))
+                else:
+                    queues.setdefault(job.host, deque()).appendleft(jid)
+                    queues.move_to_end(job.host, last=False)
+            try:
+                worker.sock.close()
+            except OSError:
+                pass
+            return failed
+
+        done = 0
+        while done < len(jobs):
+            dispatch()
+            try:
+                worker, message = self._events.get(timeout=1)
+            except queue.Empty:
+                worker, message = None, None
+
+            now = time.monotonic()
+            for quiet in [w for w in self._workers.values() if now - w.seen > self.lease]:
+                for item in drop(quiet, "lease expired"):
+                    done += 1
+                    yield item
+            if worker is None:
+                continue
+            if message is None:
+                for item in drop(worker, "disconnected"):
+                    done += 1
+                    yield item
+                continue
+
+            # One bad peer only loses its own connection (and leases)
+            try:
+                _validate(message)
+                op = message["op"]
+                if op != "hello" and worker.id not in self._workers:
+                    raise ValueError(f"{op!r} before hello")
+                if op == "result":
+                    findings = [Finding.from_dict(f) for f in message.get("findings", [])]
+            except (KeyError, TypeError, ValueError) as e:
+                for item in drop(worker, f"bad message: {e}"):
+                    done += 1
+                    yield item
+                continue
+
+            worker.seen = now
+            if op == "hello":
+                if not hmac.compare_digest(message.get("token", "").encode(), self.token.encode()):
+                    try:
+                        _send(worker.sock, worker.lock, {"op": "bye", "reason": "bad token"})
+                    except OSError:
+                        pass
+                    worker.sock.close()
+                    continue
+                worker.name = str(message.get("name"))
+                worker.slots = message.get("slots", 1)
+                self._workers[worker.id] = worker
+                try:
+                    _send(worker.sock, worker.lock,
+                          {"op": "welcome", "options": self.options, "heartbeat": self.heartbeat})
+                except OSError:
+                    continue  # its reader reports the disconnect
+                print(f"[+] Worker {worker.name} joined with {worker.slots} slots")
+            elif op in ("result", "error"):
+                jid = message["id"]
+                # Late answers for jobs that were requeued elsewhere are dropped
+                if owner.get(jid) is not worker:
+                    continue
+                job = finish(jid)
+                done += 1
+                if op == "error":
+                    yield job, [], RuntimeError(str(message.get("error")))
+                else:
+                    yield job, findings, None
+
+
+def _connect(address, retry_for=30):
+    family, address = parse_address(address)
+    deadline = time.monotonic() + retry_for
+    while True:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(1)
+
+
+def run_worker(address, job_func, slots=4, token="", setup=None):
+    """
+    Connects to a coordinator and runs the jobs it sends on `slots`
+    threads until it says bye. job_func(module, options) returns the
+    callable for a module name; setup(options), if given, runs once
+    after the welcome.
+    """
+    sock = _connect(address)
+    lock = threading.Lock()
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    _send(sock, lock, {"op": "hello", "name": name, "slots": slots, "token": token})
+    stop = threading.Event()
+
+    def beat(interval):
+        while not stop.wait(interval):
+            try:
+                _send(sock, lock, {"op": "heartbeat"})
+            except OSError:
+                return
+
+    def work(message, options):
+        try:
+            findings = job_func(message["module"], options)(message["target"]) or []
+            reply = {"op": "result", "id": message["id"], "findings": [f.to_dict() for f in findings]}
+        except Exception as e:
+            reply = {"op": "error", "id": message["id"], "error": f"{type(e).__name__}: {e}"}
+        try:
+            _send(sock, lock, reply)
+        except OSError:
+            pass  # the coordinator requeues the job
+
+    options = None
+    with ThreadPoolExecutor(max_workers=slots) as executor, sock.makefile("r", encoding="utf-8") as lines:
+        for line in lines:
+            message = json.loads(line)
+            op = message.get("op")
+            if op == "welcome":
+                options = message["options"]
+                if setup:
+                    setup(options)
+                threading.Thread(target=beat, args=(message["heartbeat"],), daemon=True).start()
+                print(f"[+] Connected to coordinator {address} as {name}")
+            elif op == "job":
+                executor.submit(work, message, options)
+            elif op == "bye":
+                print(f"[*] Coordinator closed the session: {message.get('reason')}")
+                break
+        stop.set()
+    sock.close()
@@ -1,5 +1,10 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
 from core.config_loader import load_config
+from core import metrics
 
 def run_parallel(tasks):
     findings = []
@@ -20,3 +25,105 @@ def run_parallel(tasks):
 
     return findings
 
+
+class Throttle:
+    """Spaces calls at least 1/rate seconds apart; a rate of 0 disables it."""
+
+    def __init__(self, rate=0):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Books the next slot and returns how long the caller must wait for it."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        return slot - now
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def host_of(target):
+    """Returns the host part of a URL, host:port or bare host target."""
+    target = str(target)
+    parsed = urlparse(target if "://" in target else "//" + target)
+    try:
+        return (parsed.hostname or target).lower()
+    except ValueError:
+        return target.lower()
+
+
+class Job:
+    __slots__ = ("module", "func", "target", "host")
+
+    def __init__(self, module, func, target):
+        self.module = module
+        self.func = func
+        self.target = target
+        self.host = host_of(target)
+
+    def __repr__(self):
+        return f"Job({self.module}, {self.target})"
+
+
+def _run_job(job):
+    with metrics.probe("job", job.host, module=job.module.lower()):
+        return job.func(job.target)
+
+
+class Scheduler:
+    """
+    Runs (module, target) jobs on a shared thread pool while keeping at most
+    `per_host` jobs in flight against any single host. Results are yielded
+    as soon as each job finishes, not in submission order.
+    """
+
+    def __init__(self, max_workers=5, per_host=2):
+        self.max_workers = max(1, int(max_workers))
+        self.per_host = max(1, int(per_host))
+
+    def run(self, jobs):
+        """Yields (job, findings, error) for every job as it completes."""
+        queues = OrderedDict()
+        for job in jobs:
+            queues.setdefault(job.host, deque()).append(job)
+
+        active = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queues or running:
+                # Hand out one job per host per pass so early hosts in the
+                # list can't starve the rest of the pool
+                while queues and len(running) < self.max_workers:
+                    submitted = False
+                    for host in list(queues):
+                        if len(running) >= self.max_workers:
+                            break
+                        if active.get(host, 0) >= self.per_host:
+                            continue
+                        job = queues[host].popleft()
+                        if not queues[host]:
+                            del queues[host]
+                        active[host] = active.get(host, 0) + 1
+                        running[executor.submit(_run_job, job)] = job
+                        submitted = True
+                    if not submitted:
+                        break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    active[job.host] -= 1
+                    try:
+                        result, error = future.result() or [], None
+                    except Exception as e:
+                        result, error = [], e
+                    yield job, result, error
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import datetime
+
+
+# -------------------------
+# JSON Export
+# -------------------------
+def export_json(findings):
+    os.makedirs("reports", exist_ok=True)
+    filename = f"reports/Kryphorix_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # Written one finding at a time so `findings` can be a generator
+    # (e.g. read_findings) without materialising the whole list
+    with open(filename, "w") as out:
+        sep = "[\n"
+        for finding in findings:
+            out.write(sep + textwrap.indent(json.dumps(finding.to_dict(), indent=4), "    "))
+            sep = ",\n"
+        out.write("[]" if sep == "[\n" else "\n]")
+    print(f"[+] JSON report saved: {filename}")
+
+
+def generate_pdf_background(findings_path, **kwargs):
+    """
+    Renders the PDF for a FindingsSink JSON Lines file in a detached
+    process, so the caller can return while reportlab works.
+    Returns the child's Popen handle.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, env.get("PYTHONPATH")) if p)
+    cmd = [sys.executable, "-m", "core.report", findings_path, json.dumps(kwargs)]
+    return subprocess.Popen(cmd, env=env, start_new_session=True)
@@ -1,13 +1,34 @@
+import sys
+import time
+
 SEVERITY_SCORE = {"Info":1,"Low":3,"Medium":6,"High":9,"Critical":10}
 
+
+def _intern(value):
+    return sys.intern(str(value)) if value is not None else None
+
+
 class Finding:
-    def __init__(self, title, severity, desc, fix, ref=None):
-        self.title = str(title)
+    # __slots__ keeps each finding to a fixed-size record; titles, fixes,
+    # module names and check ids repeat across hosts and are interned
+    __slots__ = ("title", "severity", "desc", "fix", "ref",
+                 "module", "target", "check_id", "timestamp")
+
+    def __init__(self, title, severity, desc, fix, ref=None,
+                 module=None, target=None, check_id=None, timestamp=None):
+        self.title = sys.intern(str(title))
         self.severity = severity if severity in SEVERITY_SCORE else "Info"
         self.desc = str(desc)
-        self.fix = str(fix)
+        self.fix = sys.intern(str(fix))
         self.ref = ref
-        self.score = SEVERITY_SCORE.get(self.severity, 1)
+        self.module = _intern(module)
+        self.target = target
+        self.check_id = _intern(check_id)
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @property
+    def score(self):
+        return SEVERITY_SCORE.get(self.severity, 1)
 
     def to_dict(self):
         return {
@@ -16,9 +37,19 @@ class Finding:
             "desc": self.desc,
             "fix": self.fix,
             "ref": self.ref,
-            "score": self.score
+            "score": self.score,
+            "module": self.module,
+            "target": self.target,
+            "check_id": self.check_id,
+            "timestamp": self.timestamp
         }
 
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["title"], data["severity"], data["desc"], data["fix"], data.get("ref"),
+                   module=data.get("module"), target=data.get("target"),
+                   check_id=data.get("check_id"), timestamp=data.get("timestamp"))
+
     def to_html(self):
         from html import escape
 
@@ -1,18 +1,69 @@
-from core.finding import Finding
+import json
+import os
+import threading
+import time
+from core.finding import Finding, SEVERITY_SCORE
+from core.engine import host_of
+
+# Above this many findings, reports default to the grouped view
+GROUP_THRESHOLD = 50
 
 class FindingsManager:
+    """
+    Holds findings together with running severity/module counters and
+    indexes by host, module and title, so summaries are O(1) and lookups
+    O(k) in the number of matches. Indexes use the finding's module and
+    target at the time it is added.
+    """
+
     def __init__(self):
         self.findings = []
+        self._severity = {"Critical":0,"High":0,"Medium":0,"Low":0,"Info":0}
+        self._by_host = {}
+        self._by_module = {}
+        self._by_title = {}
 
     def add(self, finding: Finding):
         if isinstance(finding, Finding):
             self.findings.append(finding)
+            self._severity[finding.severity] = self._severity.get(finding.severity, 0) + 1
+            if finding.target is not None:
+                self._by_host.setdefault(host_of(finding.target), []).append(finding)
+            self._by_module.setdefault(finding.module, []).append(finding)
+            self._by_title.setdefault(finding.title, []).append(finding)
+
+    def extend(self, findings):
+        for f in findings:
+            self.add(f)
 
     def summary(self):
-        summary = {"Critical":0,"High":0,"Medium":0,"Low":0,"Info":0}
-        for f in self.findings:
-            summary[f.severity] = summary.get(f.severity, 0) + 1
-        return summary
+        return dict(self._severity)
+
+    def module_summary(self):
+        return {module: len(items) for module, items in self._by_module.items()}
+
+    def by_host(self, host):
+        return list(self._by_host.get(host_of(host), ()))
+
+    def by_module(self, module):
+        return list(self._by_module.get(module, ()))
+
+    def by_title(self, title):
+        return list(self._by_title.get(title, ()))
+
+    def filter(self, host=None, module=None, title=None, severity=None):
+        """Returns findings matching every given criterion, scanning only the smallest index."""
+        candidates = [index for index in (
+            self._by_host.get(host_of(host), []) if host is not None else None,
+            self._by_module.get(module, []) if module is not None else None,
+            self._by_title.get(title, []) if title is not None else None,
+        ) if index is not None]
+        pool = min(candidates, key=len) if candidates else self.findings
+        return [f for f in pool
+                if (host is None or (f.target is not None and host_of(f.target) == host_of(host)))
+                and (module is None or f.module == module)
+                and (title is None or f.title == title)
+                and (severity is None or f.severity == severity)]
 
     def to_dict(self):
         return [f.to_dict() for f in self.findings]
@@ -23,3 +74,183 @@ class FindingsManager:
     def __len__(self):
         return len(self.findings)
 
+
+class FindingGroup:
+    """All findings sharing one (module, check_id, title), with the targets they affect."""
+    __slots__ = ("module", "check_id", "title", "severity", "desc", "fix", "targets", "count")
+
+    def __init__(self, finding):
+        self.module = finding.module
+        self.check_id = finding.check_id
+        self.title = finding.title
+        self.severity = finding.severity
+        self.desc = finding.desc
+        self.fix = finding.fix
+        self.targets = {}
+        self.count = 0
+
+    @property
+    def score(self):
+        return SEVERITY_SCORE.get(self.severity, 1)
+
+    def add(self, finding):
+        self.count += 1
+        if finding.target is not None:
+            self.targets[finding.target] = None
+        if SEVERITY_SCORE.get(finding.severity, 1) > self.score:
+            self.severity = finding.severity
+
+    def affected(self, limit=5):
+        """Short human-readable list of affected targets."""
+        targets = list(self.targets)
+        text = ", ".join(str(t) for t in targets[:limit])
+        if len(targets) > limit:
+            text += f", +{len(targets) - limit} more"
+        return f"{len(targets)} target(s): {text}" if targets else f"{self.count} occurrence(s)"
+
+    def to_dict(self):
+        return {
+            "module": self.module,
+            "check_id": self.check_id,
+            "title": self.title,
+            "severity": self.severity,
+            "score": self.score,
+            "desc": self.desc,
+            "fix": self.fix,
+            "count": self.count,
+            "affected_targets": list(self.targets)
+        }
+
+
+class FindingsAggregator:
+    """
+    Collapses identical findings from many targets into FindingGroups as
+    they arrive, keyed on (module, check_id, title) in a dict, so grouping
+    costs O(1) per finding and needs no sort at the end.
+    """
+
+    def __init__(self):
+        self._groups = {}
+        self.total = 0
+
+    def add(self, finding: Finding):
+        if not isinstance(finding, Finding):
+            return
+        key = (finding.module, finding.check_id, finding.title)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = FindingGroup(finding)
+        group.add(finding)
+        self.total += 1
+
+    def extend(self, findings):
+        for f in findings:
+            self.add(f)
+
+    def groups(self):
+        return list(self._groups.values())
+
+    def __len__(self):
+        return len(self._groups)
+
+
+def aggregate(findings):
+    aggregator = FindingsAggregator()
+    aggregator.extend(findings)
+    return aggregator.groups()
+
+
+class FindingsTee:
+    """Forwards every finding to several sinks (e.g. a FindingsSink and an aggregator)."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def add(self, finding):
+        for sink in self.sinks:
+            sink.add(finding)
+
+    def extend(self, findings):
+        for f in findings:
+            self.add(f)
+
+
+class FindingsSink:
+    """
+    Streams findings to a JSON Lines file as they are produced instead of
+    holding them in memory. Lines are flushed and fsync'd every
+    `batch_size` findings or `sync_interval` seconds, whichever comes first,
+    so a crash loses at most one batch and the file can be tailed mid-scan.
+    An existing file is replaced: a resumed run replays its checkpointed
+    findings rather than appending to the old stream.
+    """
+
+    def __init__(self, path, batch_size=100, sync_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self.counts = {"Critical":0,"High":0,"Medium":0,"Low":0,"Info":0}
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def add(self, finding: Finding):
+        if not isinstance(finding, Finding):
+            return
+        line = json.dumps(finding.to_dict()) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.counts[finding.severity] = self.counts.get(finding.severity, 0) + 1
+            self._pending += 1
+            if (self._pending >= self.batch_size
+                    or time.monotonic() - self._last_sync >= self.sync_interval):
+                self._sync()
+
+    def extend(self, findings):
+        for f in findings:
+            self.add(f)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def summary(self):
+        return dict(self.counts)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_findings(path):
+    """Yields the findings stored in a JSON Lines file written by FindingsSink."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield Finding.from_dict(json.loads(line))
+            except (ValueError, KeyError):
+                # A scan killed mid-write can leave a truncated last line
+                continue
+
@@ -1,21 +1,287 @@
-def fingerprint(server):
-    if not server:
-        return "Unknown"
+"""
+Service fingerprinting from banners and HTTP response headers.
+
+Signatures (core/signatures.json plus any files in config
+fingerprint.signatures) name a product, the text they apply to (`source`:
+"banner" or "header:<name>"), a regex with an optional `version` group, and
+a lowercase `literal` that every text the regex matches contains (checked
+against the pattern when the signatures are compiled). They are
+compiled once into one Aho-Corasick automaton per source over the literals:
+a lookup is a single pass over the text plus the regexes of the few
+signatures whose literal occurred, so its cost doesn't grow with the size
+of the database. A header signature may leave out the literal when the
+header itself names the product (X-Jenkins); it is tried whenever the
+header is present.
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+from collections import deque
+from core.config_loader import load_config
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+BUILTIN_SIGNATURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "signatures.json")
+
+# Sent to services that stay silent after connecting, and straight away on
+# these ports where the service only ever answers a request
+HTTP_PROBE = b"HEAD / HTTP/1.0\r\n\r\n"
+HTTP_PORTS = {80, 81, 3000, 5000, 8000, 8008, 8080, 8081, 8888, 9200}
+
+_signatures = None
+_results = {}
+_lock = threading.Lock()
+
+
+class Match:
+    """A product identified on a service, with its version when the text shows one."""
+    __slots__ = ("product", "service", "version")
+
+    def __init__(self, product, service, version=None):
+        self.product = product
+        self.service = service
+        self.version = version
+
+    def __str__(self):
+        return f"{self.product} {self.version}" if self.version else self.product
+
+    def __repr__(self):
+        return f"Match({self.product!r}, {self.service!r}, {self.version!r})"
+
+    def to_dict(self):
+        return {"product": self.product, "service": self.service, "version": self.version}
+
+
+class _Automaton:
+    """Aho-Corasick automaton: search() finds the values of every literal in a text in one pass."""
+
+    def __init__(self, literals):
+        goto, fail, out = [{}], [0], [[]]
+        for literal, value in literals:
+            state = 0
+            for ch in literal:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                state = nxt
+            out[state].append(value)
+
+        # Breadth first, so a state's fallback is always finished before it
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in goto[state].items():
+                pending.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+
+        self.goto = goto
+        self.fail = fail
+        self.out = [tuple(values) for values in out]
+
+    def search(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+def _required_runs(items, runs, current):
+    # Collects the runs of literal characters in a parsed pattern's
+    # top-level sequence; anything optional or variable ends a run
+    for op, arg in items:
+        if op is sre_parse.LITERAL:
+            current.append(chr(arg))
+        elif op is sre_parse.SUBPATTERN:
+            _required_runs(arg[-1], runs, current)
+        elif op is not sre_parse.AT:
+            runs.append("".join(current))
+            current.clear()
+
 
-    s = str(server).lower()
+def required_text(pattern):
+    """Lowercased runs of literal text that every match of `pattern` contains."""
+    runs, current = [], []
+    _required_runs(sre_parse.parse(pattern), runs, current)
+    runs.append("".join(current))
+    return [run.lower() for run in runs if run]
 
-    if "apache" in s:
-        return "Apache"
-    if "nginx" in s:
-        return "Nginx"
-    if "iis" in s or "microsoft-iis" in s:
-        return "IIS"
-    if "cloudflare" in s:
-        return "Cloudflare"
-    if "openresty" in s:
-        return "OpenResty"
-    if "gunicorn" in s:
-        return "Gunicorn"
 
-    return server
+class SignatureSet:
+    """
+    Compiled signatures. match(source, text) returns the Matches of the
+    signatures for `source`, in database order; "generic" signatures
+    (e.g. any SSH server) only count when nothing more specific matched,
+    and not at all with generic=False.
+    """
 
+    def __init__(self, signatures):
+        self.signatures = []
+        by_source = {}
+        self._always = {}
+        for index, sig in enumerate(signatures):
+            source = sig.get("source", "banner")
+            literal = sig.get("literal")
+            if literal is None and source.startswith("header:"):
+                self._always.setdefault(source, set()).add(index)
+            elif not literal or literal != literal.lower():
+                raise ValueError(f"signature {index} ({sig.get('product')}): literal must be non-empty lowercase text")
+            try:
+                regex = re.compile(sig["pattern"], re.IGNORECASE)
+            except (KeyError, re.error) as e:
+                raise ValueError(f"signature {index} ({sig.get('product')}): bad pattern: {e}")
+            # The automaton only tries the regex where the literal occurs
+            if literal is not None and not any(literal in run for run in required_text(sig["pattern"])):
+                raise ValueError(f"signature {index} ({sig.get('product')}): literal {literal!r} "
+                                 f"is not text every match of the pattern contains")
+            self.signatures.append((sig["product"], sig.get("service"), regex, bool(sig.get("generic"))))
+            literals = by_source.setdefault(source, [])
+            if literal is not None:
+                literals.append((literal, index))
+        self._automata = {source: _Automaton(literals) for source, literals in by_source.items()}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def match(self, source, text, generic=True):
+        automaton = self._automata.get(source)
+        if automaton is None or not text:
+            return []
+        matches, fallback = [], []
+        for index in sorted(automaton.search(text.lower()) | self._always.get(source, set())):
+            product, service, regex, is_generic = self.signatures[index]
+            if is_generic and not generic:
+                continue
+            m = regex.search(text)
+            if m:
+                found = Match(product, service, m.groupdict().get("version"))
+                (fallback if is_generic else matches).append(found)
+        return matches or fallback[:1]
+
+    def match_headers(self, headers):
+        """Matches for a mapping of HTTP header names to values."""
+        matches = []
+        for name, value in headers.items():
+            if value:
+                matches += self.match("header:" + name.lower(), value)
+        return matches
+
+    def match_banner(self, banner):
+        """Matches for a raw banner; an HTTP response is also matched by its headers."""
+        headers = self.match_headers(parse_headers(banner)) if banner.startswith("HTTP/") else []
+        return headers + self.match("banner", banner, generic=not headers)
+
+
+def parse_headers(response):
+    """
+    Header fields of a raw HTTP response as a dict with lowercase names; a
+    repeated header's values are joined with ", ", as requests does.
+    """
+    headers = {}
+    for line in response.split("\r\n\r\n", 1)[0].splitlines()[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            name, value = name.strip().lower(), value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    return headers
+
+
+def load_signatures(paths):
+    """Reads and compiles signature files; raises ValueError on a bad signature."""
+    signatures = []
+    for path in paths:
+        with open(path, "r") as f:
+            signatures += json.load(f)["signatures"]
+    return SignatureSet(signatures)
+
+
+def get_signatures():
+    """The built-in signatures plus config fingerprint.signatures, compiled on first use."""
+    global _signatures
+    if _signatures is None:
+        with _lock:
+            if _signatures is None:
+                extra = load_config()["fingerprint"]["signatures"]
+                _signatures = load_signatures([BUILTIN_SIGNATURES, *extra])
+    return _signatures
+
+
+def _unique(matches):
+    # One entry per product, keeping the first that has a version
+    best = {}
+    for m in matches:
+        if m.product not in best or (m.version and not best[m.product].version):
+            best[m.product] = m
+    return list(best.values())
+
+
+def identify(host, port, banner=None, headers=None):
+    """
+    Products identified on host:port from a raw banner and/or a mapping of
+    HTTP response headers. Each kind of evidence is matched once per run;
+    the result combines everything seen for the (host, port) so far, so a
+    banner that matched nothing doesn't hide what the headers show.
+    """
+    host = host.lower()
+    signatures = None
+    for source, evidence in (("headers", headers), ("banner", banner)):
+        key = (host, port, source)
+        if evidence and key not in _results:
+            signatures = signatures or get_signatures()
+            if source == "headers":
+                _results[key] = signatures.match_headers(evidence)
+            else:
+                _results[key] = signatures.match_banner(evidence)
+    return _unique(_results.get((host, port, "headers"), []) + _results.get((host, port, "banner"), []))
+
+
+def clear():
+    with _lock:
+        _results.clear()
+
+
+async def read_banner(loop, sock, port, timeout, size=2048):
+    """
+    Reads a banner from a connected non-blocking socket within `timeout`
+    seconds: what the service says first or, if it stays silent for half
+    of that, its answer to an HTTP request. Returns "" when nothing arrives.
+    """
+    try:
+        if port not in HTTP_PORTS:
+            timeout /= 2
+            try:
+                data = await asyncio.wait_for(loop.sock_recv(sock, size), timeout)
+                return data.decode("latin-1")
+            except asyncio.TimeoutError:
+                pass
+        await loop.sock_sendall(sock, HTTP_PROBE)
+        data = await asyncio.wait_for(loop.sock_recv(sock, size), timeout)
+        return data.decode("latin-1")
+    except (asyncio.TimeoutError, OSError):
+        return ""
+
+
+def fingerprint(server):
+    """Product name for a Server header value (the value itself if unknown)."""
+    if not server:
+        return "Unknown"
+    matches = get_signatures().match("header:server", str(server))
+    return matches[0].product if matches else server
@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Latency histogram bucket upper bounds in seconds (Prometheus "le")
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# A refused connection is an answer (closed port), not a failure
+OK, REFUSED, TIMEOUT, ERROR = "ok", "refused", "timeout", "error"
+
+
+def classify(exc):
+    """Maps the exception a probe raised (or None) to an outcome."""
+    if exc is None:
+        return OK
+    if isinstance(exc, ConnectionRefusedError):
+        return REFUSED
+    # socket.timeout is TimeoutError; requests' Timeout/ConnectTimeout/ReadTimeout
+    # are matched by name so this module doesn't import requests
+    if isinstance(exc, TimeoutError) or type(exc).__name__.endswith("Timeout"):
+        return TIMEOUT
+    return ERROR
+
+
+class Series:
+    """Latency histogram plus outcome and byte counters for one (module, check, host)."""
+
+    __slots__ = ("buckets", "count", "sum", "outcomes", "sent", "received", "_lock")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.outcomes = {}
+        self.sent = 0
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, outcome=OK, sent=0, received=0):
+        i = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.buckets[i] += 1
+            self.count += 1
+            self.sum += seconds
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self.sent += sent
+            self.received += received
+
+
+class Probe:
+    """Context manager timing one probe; exceptions are recorded, not swallowed."""
+
+    __slots__ = ("metrics", "check", "host", "module", "trace", "sent", "received", "start")
+
+    def __init__(self, metrics, check, host, module=None, trace=True):
+        self.metrics = metrics
+        self.check = check
+        self.host = host
+        self.module = module
+        self.trace = trace
+        self.sent = self.received = 0
+
+    def add_bytes(self, sent=0, received=0):
+        self.sent += sent
+        self.received += received
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.check, self.host, self.start, classify(exc), self.sent,
+                             self.received, self.trace, self.module)
+        return False
+
+
+class _NullProbe:
+    def add_bytes(self, sent=0, received=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PROBE = _NullProbe()
+
+
+class Metrics:
+    """
+    Per-probe instrumentation for a run. Latency, outcomes and bytes are
+    aggregated per (module, check, host); probes recorded with trace=True
+    also become complete events of a Chrome trace, up to `trace_limit`.
+    The module defaults to the check's prefix ("web.paths" -> "web").
+    """
+
+    def __init__(self, trace_limit=100000):
+        self.started = time.perf_counter()
+        self.trace_limit = trace_limit
+        self.dropped = 0
+        self._series = {}
+        self._events = []
+        self._lock = threading.Lock()
+
+    def series(self, check, host, module=None):
+        key = (module or check.partition(".")[0], check, str(host))
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, Series())
+        return series
+
+    def observe(self, check, host, start, outcome=OK, sent=0, received=0, trace=True, module=None):
+        """Records a probe that began at `start` (time.perf_counter()) and just ended."""
+        end = time.perf_counter()
+        module = module or check.partition(".")[0]
+        self.series(check, host, module).observe(end - start, outcome, sent, received)
+        if trace:
+            event = {
+                "name": f"{check} {host}", "cat": module, "ph": "X",
+                "ts": round((start - self.started) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": os.getpid(), "tid": threading.get_ident(),
+                "args": {"host": str(host), "outcome": outcome},
+            }
+            with self._lock:
+                if len(self._events) < self.trace_limit:
+                    self._events.append(event)
+                else:
+                    self.dropped += 1
+
+    def probe(self, check, host, module=None, trace=True):
+        return Probe(self, check, host, module, trace)
+
+    def items(self):
+        with self._lock:
+            return sorted(self._series.items())
+
+    def snapshot(self):
+        """Plain-data copy of the aggregates and trace events, to merge into another process's Metrics."""
+        series = [(key, list(s.buckets), s.count, s.sum, dict(s.outcomes), s.sent, s.received)
+                  for key, s in self.items()]
+        with self._lock:
+            events = list(self._events)
+        return {"started": self.started, "series": series, "events": events, "dropped": self.dropped}
+
+    def merge(self, snapshot):
+        for (module, check, host), buckets, count, total, outcomes, sent, received in snapshot["series"]:
+            s = self.series(check, host, module)
+            with s._lock:
+                s.buckets = [a + b for a, b in zip(s.buckets, buckets)]
+                s.count += count
+                s.sum += total
+                for outcome, n in outcomes.items():
+                    s.outcomes[outcome] = s.outcomes.get(outcome, 0) + n
+                s.sent += sent
+                s.received += received
+        # perf_counter is system-wide on Linux: shift the events onto this run's timeline
+        shift = round((snapshot["started"] - self.started) * 1e6, 1)
+        with self._lock:
+            room = max(0, self.trace_limit - len(self._events))
+            for event in snapshot["events"][:room]:
+                event["ts"] += shift
+                self._events.append(event)
+            self.dropped += snapshot["dropped"] + max(0, len(snapshot["events"]) - room)
+
+    def top_hosts(self, n=5):
+        """
+        Hosts ranked by time spent in scan jobs: [(host, seconds, share,
+        timeouts, errors)], share being the fraction of all job time.
+        """
+        seconds, timeouts, errors = {}, {}, {}
+        for (module, check, host), s in self.items():
+            if check == "job":
+                seconds[host] = seconds.get(host, 0.0) + s.sum
+            timeouts[host] = timeouts.get(host, 0) + s.outcomes.get(TIMEOUT, 0)
+            errors[host] = errors.get(host, 0) + s.outcomes.get(ERROR, 0)
+        total = sum(seconds.values()) or 1.0
+        ranked = sorted(seconds.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(host, secs, secs / total, timeouts[host], errors[host]) for host, secs in ranked]
+
+    def prometheus(self):
+        """Renders the aggregates in the Prometheus text exposition format."""
+        lines = [
+            "# HELP kryphorix_probe_duration_seconds Probe latency.",
+            "# TYPE kryphorix_probe_duration_seconds histogram",
+        ]
+        counters = [
+            "# HELP kryphorix_probe_total Probes by outcome.",
+            "# TYPE kryphorix_probe_total counter",
+        ]
+        transfer = [
+            "# HELP kryphorix_probe_bytes_total Bytes sent and received by probes.",
+            "# TYPE kryphorix_probe_bytes_total counter",
+        ]
+        for (module, check, host), s in self.items():
+            labels = f'module="{_escape(module)}",check="{_escape(check)}",host="{_escape(host)}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), s.buckets):
+                cumulative += count
+                lines.append(f'kryphorix_probe_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"kryphorix_probe_duration_seconds_sum{{{labels}}} {s.sum:.6f}")
+            lines.append(f"kryphorix_probe_duration_seconds_count{{{labels}}} {s.count}")
+            for outcome, count in sorted(s.outcomes.items()):
+                counters.append(f'kryphorix_probe_total{{{labels},outcome="{outcome}"}} {count}')
+            if s.sent or s.received:
+                transfer.append(f'kryphorix_probe_bytes_total{{{labels},direction="sent"}} {s.sent}')
+                transfer.append(f'kryphorix_probe_bytes_total{{{labels},direction="received"}} {s.received}')
+        return "\n".join(lines + counters + transfer) + "\n"
+
+    def write_prometheus(self, path):
+        # node_exporter's textfile collector may read at any time: write then rename
+        _write_atomic(path, self.prometheus())
+        print(f"[+] Metrics saved: {path}")
+
+    def write_trace(self, path):
+        """Writes the Chrome trace (chrome://tracing, Perfetto) of the run."""
+        with self._lock:
+            events = list(self._events)
+        trace = {"traceEvents": events, "displayTimeUnit": "ms",
+                 "otherData": {"dropped_events": self.dropped}}
+        _write_atomic(path, json.dumps(trace))
+        print(f"[+] Trace saved: {path}")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+_metrics = None
+
+
+def enable_metrics(trace_limit=100000):
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(trace_limit)
+    return _metrics
+
+
+def get_metrics():
+    """Returns the active Metrics, or None when instrumentation is off."""
+    return _metrics
+
+
+def probe(check, host, module=None, trace=True):
+    """Times a probe in a with-block; a no-op unless metrics are enabled."""
+    metrics = _metrics
+    return _NULL_PROBE if metrics is None else metrics.probe(check, host, module, trace)
+
+
+def observe(check, host, start, outcome=OK, sent=0, received=0, trace=True, module=None):
+    metrics = _metrics
+    if metrics is not None:
+        metrics.observe(check, host, start, outcome, sent, received, trace, module)
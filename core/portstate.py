@@ -0,0 +1,126 @@
+import errno
+import socket
+import threading
+import time
+from core.config_loader import load_config
+from core.rtt import connect as rtt_connect, get_rtt
+from core import adaptive, metrics
+
+OPEN, CLOSED, FILTERED = "open", "closed", "filtered"
+
+
+class PortStates:
+    """
+    Run-wide (host, port) -> state table filled by every module's connects
+    (port scans, discovery, AD, TLS), so a port answered once isn't probed
+    again by the next module. Entries are trusted for `ttl` seconds.
+
+    A filtered verdict only means no answer within the timeout it was
+    probed with: get() returns it only to callers that would wait no
+    longer than that. A caller with a longer timeout probes again.
+    """
+
+    def __init__(self, ttl=600):
+        self.ttl = ttl
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def get(self, host, port, timeout):
+        """State of host:port for a caller that would wait `timeout` seconds, or None."""
+        entry = self._states.get((host.lower(), port))
+        if entry is None or time.monotonic() - entry[1] >= self.ttl:
+            return None
+        if entry[0] == FILTERED and entry[2] < timeout:
+            return None
+        return entry[0]
+
+    def set(self, host, port, state, timeout):
+        """Records a state found by a probe that waited up to `timeout` seconds."""
+        # A single dict store: atomic without the lock
+        self._states[(host.lower(), port)] = (state, time.monotonic(), timeout)
+
+    def update(self, host, states, timeout):
+        """Records a {port: state} dict for host, probed with `timeout`."""
+        now = time.monotonic()
+        host = host.lower()
+        with self._lock:
+            self._states.update(((host, port), (state, now, timeout)) for port, state in states.items())
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self):
+        return len(self._states)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_port_states():
+    """Returns the run's PortStates, or None when config portstate.enabled is off."""
+    global _table
+    if _table is None:
+        cfg = load_config()["portstate"]
+        if not cfg["enabled"]:
+            return None
+        with _table_lock:
+            if _table is None:
+                _table = PortStates(cfg["ttl"])
+    return _table
+
+
+def connect(address, timeout):
+    """
+    rtt.connect() that consults the table first: a port already known to
+    be closed or filtered fails at once without a packet. The outcome of
+    a real connect is recorded.
+    """
+    table = get_port_states()
+    if table is None:
+        return rtt_connect(address, timeout)
+
+    host, port = address[:2]
+    known = table.get(host, port, timeout)
+    if known == CLOSED:
+        raise ConnectionRefusedError(errno.ECONNREFUSED, f"Connection refused ({host}:{port} known closed)")
+    if known == FILTERED:
+        raise socket.timeout(f"timed out ({host}:{port} known filtered)")
+    # rtt.connect may give up after attempts shorter than `timeout`
+    rtt = get_rtt()
+    waited = max(rtt.attempts(host, timeout)) if rtt is not None else timeout
+    try:
+        sock = rtt_connect(address, timeout)
+    except ConnectionRefusedError:
+        table.set(host, port, CLOSED, timeout)
+        raise
+    except socket.timeout:
+        table.set(host, port, FILTERED, waited)
+        raise
+    table.set(host, port, OPEN, timeout)
+    return sock
+
+
+def port_state(address, timeout, check="tcp.connect"):
+    """
+    State of one port: from the table when known, otherwise from a single
+    connect (recorded under the metrics `check`). Name resolution errors
+    propagate; other connect failures count as filtered, but only
+    timeouts are recorded as such.
+    """
+    host, port = address[:2]
+    table = get_port_states()
+    known = table.get(host, port, timeout) if table is not None else None
+    if known is not None:
+        return known
+    try:
+        with adaptive.slot(host, "tcp"), metrics.probe(check, host):
+            connect(address, timeout).close()
+    except ConnectionRefusedError:
+        return CLOSED
+    except socket.gaierror:
+        raise
+    except OSError:
+        return FILTERED
+    return OPEN
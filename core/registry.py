@@ -0,0 +1,49 @@
+import importlib
+
+
+class Registry:
+    """
+    Maps names to "package.module:attribute" paths and imports each entry
+    the first time it is looked up, so scanners, report backends and
+    plugins that a run doesn't select never cost startup time.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self._paths = {}
+        self._loaded = {}
+
+    def register(self, name, path):
+        self._paths[name] = path
+        self._loaded.pop(name, None)
+
+    def get(self, name):
+        if name not in self._loaded:
+            if name not in self._paths:
+                raise KeyError(f"unknown {self.kind}: {name}")
+            module, _, attr = self._paths[name].partition(":")
+            obj = importlib.import_module(module)
+            self._loaded[name] = getattr(obj, attr) if attr else obj
+        return self._loaded[name]
+
+    def path(self, name):
+        return self._paths[name]
+
+    def names(self):
+        return list(self._paths)
+
+    def __contains__(self, name):
+        return name in self._paths
+
+
+SCAN_MODULES = Registry("scan module")
+SCAN_MODULES.register("Web", "modules.web:web_scan")
+SCAN_MODULES.register("API", "modules.api:api_scan")
+SCAN_MODULES.register("AD", "modules.ad:ad_scan")
+SCAN_MODULES.register("Ports", "modules.ports:port_scan")
+SCAN_MODULES.register("TLS", "modules.tls:tls_check")
+SCAN_MODULES.register("Wireless", "modules.wireless:wireless_scan")
+
+REPORTS = Registry("report backend")
+REPORTS.register("pdf", "core.report:generate_pdf")
+REPORTS.register("json", "core.export:export_json")
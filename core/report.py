@@ -4,9 +4,105 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from datetime import datetime
 import os
+import sys
 import json
+import textwrap
+# Kept importable from here; they live in core.export so writing JSON or
+# spawning the background renderer doesn't load reportlab
+from core.export import export_json, generate_pdf_background
 
-def generate_pdf(findings, logo_path="assets/kryphorix_logo.png", filename=None, targets=None):
+# Rows per detail table. reportlab lays out and splits each Table as a
+# whole, so one huge table costs far more than many page-sized ones.
+DETAIL_CHUNK_ROWS = 250
+
+DETAIL_COL_WIDTHS = [100, 120, 60, 200, 150]
+CELL_FONT_SIZE, CELL_PADDING = 10, 12
+# Conservative average Helvetica glyph width, in ems, used for wrapping
+CHAR_WIDTH = 0.55
+
+SEVERITY_COLORS = {
+    "Info": colors.blue,
+    "Low": colors.green,
+    "Medium": colors.orange,
+    "High": colors.red,
+    "Critical": colors.darkred
+}
+
+HEADER_STYLE = [
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#2E86C1")),
+    ('TEXTCOLOR',(0,0),(-1,0),colors.white),
+    ('FONTNAME', (0,0),(-1,0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING',(0,0),(-1,0),6),
+    ('BACKGROUND',(0,1),(-1,-1),colors.whitesmoke),
+    ('GRID',(0,0),(-1,-1),1,colors.grey),
+]
+
+
+def _summary_table(header, counts):
+    data = [header] + [[key, str(count)] for key, count in counts.items()]
+    table = Table(data, colWidths=[200, 100])
+    table.setStyle(TableStyle(HEADER_STYLE + [
+        ('ALIGN',(0,0),(-1,-1),'CENTER'),
+        ('FONTSIZE',(0,0),(-1,0),12),
+    ]))
+    return table
+
+
+def _cell(text, width):
+    # Wrap by character count into a multi-line string cell. A Paragraph
+    # per cell wraps more precisely but measures every word, which
+    # dominates render time at tens of thousands of rows.
+    text = str(text)
+    chars = max(8, int((width - CELL_PADDING) / (CELL_FONT_SIZE * CHAR_WIDTH)))
+    if len(text) <= chars:
+        return text
+    return "\n".join(textwrap.wrap(text, chars, break_long_words=True))
+
+
+def _detail_tables(findings, grouped=False):
+    # Grouped rows are FindingGroups: the description column lists the
+    # affected targets instead
+    header = ["Module","Title", "Severity", "Affected Targets" if grouped else "Description",
+              "Fix / Recommendation"]
+    widths = DETAIL_COL_WIDTHS
+    rows, severities = [header], []
+
+    def flush():
+        # One TableStyle per chunk: per-row setStyle calls grow the style
+        # list the table re-walks on every split
+        style = HEADER_STYLE + [
+            ('ALIGN',(0,0),(-1,-1),'LEFT'),
+            ('VALIGN',(0,0),(-1,-1),'TOP'),
+            ('FONTSIZE',(0,0),(-1,-1),CELL_FONT_SIZE),
+            ('LEADING',(0,0),(-1,-1),CELL_FONT_SIZE + 2),
+        ]
+        style += [('TEXTCOLOR', (2,i), (2,i), SEVERITY_COLORS.get(sev, colors.black))
+                  for i, sev in enumerate(severities, start=1)]
+        table = Table(rows, colWidths=widths, repeatRows=1)
+        table.setStyle(TableStyle(style))
+        return table
+
+    for f in findings:
+        rows.append([
+            _cell(f.module or "Unknown", widths[0]),
+            _cell(f.title, widths[1]),
+            f.severity,
+            _cell(f.affected() if grouped else f.desc, widths[3]),
+            _cell(f.fix, widths[4]),
+        ])
+        severities.append(f.severity)
+        if len(severities) == DETAIL_CHUNK_ROWS:
+            yield flush()
+            rows, severities = [header], []
+    if severities:
+        yield flush()
+
+
+def generate_pdf(findings, logo_path="assets/kryphorix_logo.png", filename=None, targets=None, grouped=False):
+    """
+    Renders the PDF report. With grouped=True, `findings` are FindingGroups
+    (see core.findings.aggregate) and get one detail row per group.
+    """
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"reports/Kryphorix_Report_{timestamp}.pdf"
@@ -38,91 +134,32 @@ def generate_pdf(findings, logo_path="assets/kryphorix_logo.png", filename=None,
     module_counts = {}
     severity_counts = {}
     for f in findings:
-        module_counts[f.module] = module_counts.get(f.module, 0) + 1
-        severity_counts[f.severity] = severity_counts.get(f.severity, 0) + 1
+        module = f.module or "Unknown"
+        weight = f.count if grouped else 1
+        module_counts[module] = module_counts.get(module, 0) + weight
+        severity_counts[f.severity] = severity_counts.get(f.severity, 0) + weight
 
-    # Module summary table
     elements.append(Paragraph("Module Summary", header_style))
-    data = [["Module", "Findings Count"]]
-    for module, count in module_counts.items():
-        data.append([module, str(count)])
-    table = Table(data, colWidths=[200, 100])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#2E86C1")),
-        ('TEXTCOLOR',(0,0),(-1,0),colors.white),
-        ('ALIGN',(0,0),(-1,-1),'CENTER'),
-        ('FONTNAME', (0,0),(-1,0), 'Helvetica-Bold'),
-        ('FONTSIZE',(0,0),(-1,0),12),
-        ('BOTTOMPADDING',(0,0),(-1,0),6),
-        ('BACKGROUND',(0,1),(-1,-1),colors.whitesmoke),
-        ('GRID',(0,0),(-1,-1),1,colors.grey),
-    ]))
-    elements.append(table)
+    elements.append(_summary_table(["Module", "Findings Count"], module_counts))
     elements.append(Spacer(1,12))
 
-    # Severity summary table
     elements.append(Paragraph("Severity Summary", header_style))
-    data = [["Severity", "Count"]]
-    for sev, count in severity_counts.items():
-        data.append([sev, str(count)])
-    table = Table(data, colWidths=[200, 100])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#2E86C1")),
-        ('TEXTCOLOR',(0,0),(-1,0),colors.white),
-        ('ALIGN',(0,0),(-1,-1),'CENTER'),
-        ('FONTNAME', (0,0),(-1,0), 'Helvetica-Bold'),
-        ('FONTSIZE',(0,0),(-1,0),12),
-        ('BOTTOMPADDING',(0,0),(-1,0),6),
-        ('BACKGROUND',(0,1),(-1,-1),colors.whitesmoke),
-        ('GRID',(0,0),(-1,-1),1,colors.grey),
-    ]))
-    elements.append(table)
+    elements.append(_summary_table(["Severity", "Count"], severity_counts))
     elements.append(PageBreak())
 
     # -------------------------
     # Detailed Findings Table
     # -------------------------
     elements.append(Paragraph("Detailed Findings", header_style))
-    data = [["Module","Title", "Severity", "Description", "Fix / Recommendation"]]
-    severity_colors = {
-        "Info": colors.blue,
-        "Low": colors.green,
-        "Medium": colors.orange,
-        "High": colors.red,
-        "Critical": colors.darkred
-    }
-    for f in findings:
-        data.append([f.module, f.title, f.severity, f.desc, f.fix])
-
-    table = Table(data, colWidths=[100,120,60,200,150], repeatRows=1)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#2E86C1")),
-        ('TEXTCOLOR',(0,0),(-1,0),colors.white),
-        ('ALIGN',(0,0),(-1,-1),'LEFT'),
-        ('FONTNAME', (0,0),(-1,0), 'Helvetica-Bold'),
-        ('FONTSIZE',(0,0),(-1,0),10),
-        ('BOTTOMPADDING',(0,0),(-1,0),6),
-        ('BACKGROUND',(0,1),(-1,-1),colors.whitesmoke),
-        ('GRID',(0,0),(-1,-1),1,colors.grey),
-    ]))
-    for i, f in enumerate(findings, start=1):
-        table.setStyle(TableStyle([
-            ('TEXTCOLOR', (2,i), (2,i), severity_colors.get(f.severity, colors.black))
-        ]))
-    elements.append(table)
+    elements.extend(_detail_tables(findings, grouped))
 
     doc.build(elements)
     print(f"[+] PDF report saved: {filename}")
 
 
-# -------------------------
-# JSON Export
-# -------------------------
-def export_json(findings):
-    os.makedirs("reports", exist_ok=True)
-    data = [f.to_dict() for f in findings]
-    filename = f"reports/Kryphorix_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=4)
-    print(f"[+] JSON report saved: {filename}")
-
+if __name__ == "__main__":
+    # Entry point for generate_pdf_background: <findings.jsonl> [kwargs JSON]
+    from core.findings import read_findings, aggregate
+    options = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
+    findings = read_findings(sys.argv[1])
+    generate_pdf(aggregate(findings) if options.get("grouped") else list(findings), **options)
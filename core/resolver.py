@@ -0,0 +1,129 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.config_loader import load_config
+from core import metrics
+
+
+class Resolver:
+    """
+    Process-wide getaddrinfo cache. Successful lookups are kept for `ttl`
+    seconds and failures (NXDOMAIN, no address) for `negative_ttl` seconds.
+    Concurrent lookups of the same name wait for a single resolver call.
+
+    The stdlib resolver doesn't expose record TTLs, so `ttl` acts as an
+    upper bound on how long an answer is trusted.
+    """
+
+    def __init__(self, ttl=300, negative_ttl=30):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, host):
+        key = host.strip("[]").lower()
+        while True:
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+                event = self._pending.get(key)
+                owner = event is None
+                if owner:
+                    event = self._pending[key] = threading.Event()
+            if owner:
+                break
+            event.wait()
+
+        start = time.perf_counter()
+        try:
+            result, ttl = socket.getaddrinfo(key, None, 0, socket.SOCK_STREAM), self.ttl
+        except socket.gaierror as e:
+            result, ttl = e, self.negative_ttl
+        finally:
+            with self._lock:
+                del self._pending[key]
+            event.set()
+        metrics.observe("dns.resolve", key, start,
+                        metrics.ERROR if isinstance(result, Exception) else metrics.OK)
+
+        if ttl > 0:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + ttl, result)
+        return result
+
+    def getaddrinfo(self, host, port, family=0):
+        """Cached equivalent of socket.getaddrinfo(host, port, family, SOCK_STREAM)."""
+        result = self._lookup(host)
+        if isinstance(result, socket.gaierror):
+            raise socket.gaierror(*result.args)
+        return [(af, socktype, proto, canonname, (sa[0], port) + tuple(sa[2:]))
+                for af, socktype, proto, canonname, sa in result
+                if not family or af == family]
+
+    def resolve(self, host):
+        """Returns the first address for host."""
+        return self.getaddrinfo(host, 0)[0][4][0]
+
+    def create_connection(self, address, timeout=None, source_address=None):
+        """socket.create_connection() using cached addresses."""
+        host, port = address[:2]
+        err = None
+        for af, socktype, proto, _, sa in self.getaddrinfo(host, port):
+            sock = socket.socket(af, socktype, proto)
+            try:
+                if timeout is not None:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sa)
+                return sock
+            except OSError as e:
+                err = e
+                sock.close()
+        raise err or OSError(f"no addresses for {host}")
+
+    def prefetch(self, hosts, threads=32):
+        """Resolves every host concurrently so later probes hit the cache."""
+        hosts = list(dict.fromkeys(hosts))
+        if not hosts:
+            return
+        with ThreadPoolExecutor(max_workers=min(threads, len(hosts))) as executor:
+            list(executor.map(self._lookup, hosts))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                dns = load_config()["dns"]
+                _resolver = Resolver(dns["ttl"], dns["negative_ttl"])
+    return _resolver
+
+
+def getaddrinfo(host, port, family=0):
+    return get_resolver().getaddrinfo(host, port, family)
+
+
+def resolve(host):
+    return get_resolver().resolve(host)
+
+
+def create_connection(address, timeout=None, source_address=None):
+    return get_resolver().create_connection(address, timeout, source_address)
+
+
+def prefetch(hosts, threads=32):
+    get_resolver().prefetch(hosts, threads)
@@ -0,0 +1,128 @@
+import socket
+import threading
+import time
+from core.config_loader import load_config
+from core.resolver import create_connection
+
+# RFC 6298 gains: SRTT and RTTVAR move 1/8 and 1/4 of the way to each sample
+ALPHA, BETA = 0.125, 0.25
+
+
+class RTTEstimator:
+    """
+    Smoothed round-trip time and variance for one host, computed like
+    TCP's retransmission timeout (RFC 6298). Connects that get any answer,
+    a SYN-ACK or a RST, are samples; timeouts are not.
+    """
+
+    __slots__ = ("srtt", "rttvar", "samples", "_lock")
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def sample(self, rtt):
+        with self._lock:
+            if self.srtt is None:
+                self.srtt, self.rttvar = rtt, rtt / 2
+            else:
+                self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+                self.srtt = (1 - ALPHA) * self.srtt + ALPHA * rtt
+            self.samples += 1
+
+    def timeout(self, ceiling, floor=0.1, k=4):
+        """SRTT + k*RTTVAR clamped to [floor, ceiling]; the ceiling until the first sample."""
+        srtt = self.srtt
+        if srtt is None:
+            return ceiling
+        return min(ceiling, max(floor, srtt + k * self.rttvar))
+
+
+class RTTTable:
+    """
+    Per-host RTT estimators shared by every module for the run. `ceiling`
+    arguments are the module's configured timeout: adaptive timeouts only
+    ever shorten it. A probe that times out under a shortened timeout is
+    retried up to `retries` times with the timeout doubled each time.
+    """
+
+    def __init__(self, min_timeout=0.1, k=4, retries=1):
+        self.min_timeout = min_timeout
+        self.k = k
+        self.retries = retries
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def estimator(self, host):
+        est = self._hosts.get(host)
+        if est is None:
+            with self._lock:
+                est = self._hosts.setdefault(host, RTTEstimator())
+        return est
+
+    def timeout(self, host, ceiling):
+        return self.estimator(host).timeout(ceiling, self.min_timeout, self.k)
+
+    def attempts(self, host, ceiling):
+        """Yields the timeout for each try: the estimate, then doubled up to the ceiling."""
+        timeout = self.timeout(host, ceiling)
+        yield timeout
+        for _ in range(self.retries):
+            if timeout >= ceiling:
+                return
+            timeout = min(ceiling, timeout * 2)
+            yield timeout
+
+    def sample(self, host, rtt):
+        self.estimator(host).sample(rtt)
+
+    def srtt(self, host):
+        est = self._hosts.get(host)
+        return est.srtt if est else None
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_rtt():
+    """Returns the process-wide RTTTable, or None when config rtt.enabled is off."""
+    global _table
+    if _table is None:
+        cfg = load_config()["rtt"]
+        if not cfg["enabled"]:
+            return None
+        with _table_lock:
+            if _table is None:
+                _table = RTTTable(cfg["min_timeout"], cfg["k"], cfg["retries"])
+    return _table
+
+
+def connect(address, timeout):
+    """
+    resolver.create_connection() with the host's adaptive connect timeout,
+    `timeout` being the ceiling. The returned socket's timeout is reset to
+    `timeout` for the reads and handshakes that follow.
+    """
+    table = get_rtt()
+    if table is None:
+        return create_connection(address, timeout=timeout)
+
+    host = address[0]
+    for attempt in table.attempts(host, timeout):
+        start = time.perf_counter()
+        try:
+            sock = create_connection(address, timeout=attempt)
+        except ConnectionRefusedError:
+            table.sample(host, time.perf_counter() - start)
+            raise
+        except socket.timeout:
+            if attempt >= timeout:
+                raise
+            continue
+        table.sample(host, time.perf_counter() - start)
+        sock.settimeout(timeout)
+        return sock
+    raise socket.timeout("timed out")
@@ -1,7 +1,102 @@
 import requests
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util import connection as urllib3_connection
 from time import sleep
 from core.config_loader import load_config
+from core.engine import Throttle, host_of
+from core import resolver
+from core import adaptive, metrics, portstate
+
+_urllib3_create_connection = urllib3_connection.create_connection
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _cached_create_connection(address, *args, **kwargs):
+    # Route urllib3's connects through the shared DNS cache; the TLS layer
+    # still uses the original hostname for SNI and certificate checks
+    host, port = address
+    err = None
+    for *_, sa in resolver.getaddrinfo(host, port, urllib3_connection.allowed_gai_family()):
+        try:
+            return _urllib3_create_connection((sa[0], port), *args, **kwargs)
+        except OSError as e:
+            err = e
+    raise err or OSError(f"no addresses for {host}")
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session used by every HTTP probe.
+    Connections are pooled per host and kept alive between probes, so a
+    target only pays for its TCP/TLS handshake once.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                http = load_config()["http"]
+                urllib3_connection.create_connection = _cached_create_connection
+                session = requests.Session()
+                # pool_connections: hosts kept pooled, pool_maxsize: keep-alive
+                # connections per host
+                adapter = HTTPAdapter(pool_connections=http["pool_connections"],
+                                      pool_maxsize=http["pool_maxsize"],
+                                      max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = http["user_agent"]
+                # Don't carry cookies from one probe into the next;
+                # responses still expose their own Set-Cookie via r.cookies
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                _session = session
+    return _session
+
+
+def http_request(method, url, timeout=5, check="http.request", **kwargs):
+    """
+    Sends one request; latency, outcome and bytes are recorded under `check`.
+    The request holds one of the host's adaptive "http" slots, and 429/503
+    answers or timeouts shrink that host's window.
+    """
+    host = host_of(url)
+    with adaptive.slot(host, "http") as slot, metrics.probe(check, host) as probe:
+        r = get_session().request(method, url, timeout=timeout, **kwargs)
+        slot.status(r.status_code)
+        body = r.request.body
+        probe.add_bytes(sent=len(body) if body else 0, received=len(r.content))
+    return r
+
+
+def http_get(url, timeout=5, **kwargs):
+    return http_request("GET", url, timeout=timeout, **kwargs)
+
+
+def http_options(url, timeout=5, **kwargs):
+    return http_request("OPTIONS", url, timeout=timeout, **kwargs)
+
+
+def probe_paths(url, paths, timeout=5, threads=1, throttle=None, check="http.paths", **kwargs):
+    """
+    GETs url+path for every path on up to `threads` pooled connections and
+    returns the paths that answered 200. Failed probes count as not exposed.
+    """
+    def probe(path):
+        if throttle:
+            throttle.wait()
+        try:
+            return http_get(url+path, timeout=timeout, check=check, **kwargs).status_code == 200
+        except requests.RequestException:
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        return [p for p, exposed in zip(paths, executor.map(probe, paths)) if exposed]
+
 
 def safe_request(method, url):
     config = load_config()
@@ -9,7 +104,7 @@ def safe_request(method, url):
 
     for _ in range(2):
         try:
-            return requests.request(method, url, timeout=timeout, verify=True)
+            return http_request(method, url, timeout=timeout, verify=True)
         except requests.RequestException:
             sleep(1)
 
@@ -22,8 +117,7 @@ def check_port(host, port):
     timeout = config.get("timeout", 3)
 
     try:
-        with socket.create_connection((host, port), timeout=timeout):
+        with portstate.connect((host, port), timeout=timeout):
             return True
     except (socket.timeout, socket.error):
         return False
-
@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import queue
+import signal
+from core.engine import Job, Scheduler
+from core.finding import Finding
+
+
+def shard_jobs(jobs, n):
+    """
+    Splits jobs into n shards, keeping each host's jobs together so the
+    per-host cap still holds. Hosts with the most jobs are placed first,
+    each on the currently lightest shard.
+    """
+    by_host = {}
+    for job in jobs:
+        by_host.setdefault(job.host, []).append(job)
+    shards = [[] for _ in range(n)]
+    for host_jobs in sorted(by_host.values(), key=len, reverse=True):
+        min(shards, key=len).extend(host_jobs)
+    return [shard for shard in shards if shard]
+
+
+def _terminate(signum, frame):
+    # Takes the cpu plugin processes this worker started down with it
+    for child in multiprocessing.active_children():
+        child.terminate()
+    os._exit(1)
+
+
+def _worker(index, jobs, threads, per_host, options, out):
+    # Runs in a fresh interpreter: process-wide state is set up again here
+    signal.signal(signal.SIGTERM, _terminate)
+    if options.get("cache"):
+        from core.cache import enable_cache
+        enable_cache()
+    metrics = None
+    if options.get("metrics"):
+        from core.metrics import enable_metrics
+        metrics = enable_metrics(options["trace_limit"])
+
+    for job, findings, error in Scheduler(threads, per_host).run(jobs):
+        if not error:
+            try:
+                out.put(("done", job.module, job.target, [f.to_dict() for f in findings]))
+                continue
+            except Exception as e:
+                error = e
+        out.put(("error", job.module, job.target, str(error)))
+    out.put(("exit", index, None, metrics.snapshot() if metrics else None))
+
+
+def run_sharded(jobs, workers, threads, per_host, options=None, metrics=None):
+    """
+    Runs jobs across `workers` processes, each with its own scheduler of
+    `threads` threads, connection pools and event loops. Yields
+    (job, findings, error) as workers report jobs finished, like
+    Scheduler.run(). Job functions must be picklable (module-level
+    functions, functools.partial, plugins).
+
+    `options` sets up each worker: {"cache": bool, "metrics": bool,
+    "trace_limit": int}. Worker metrics are merged into `metrics` on exit.
+    """
+    options = options or {}
+    # spawn: forking a process full of scan threads can copy held locks
+    context = multiprocessing.get_context("spawn")
+    out = context.Queue()
+    processes = {}
+    pending = {}
+    for index, shard in enumerate(shard_jobs(jobs, workers)):
+        # Not daemonic, so cpu plugins can start their own processes; the
+        # finally below terminates and joins the workers instead
+        p = context.Process(target=_worker, args=(index, shard, threads, per_host, options, out))
+        p.start()
+        processes[index] = p
+        pending[index] = {(job.module, job.target): job for job in shard}
+
+    running = set(processes)
+    try:
+        while running:
+            try:
+                kind, module, target, payload = out.get(timeout=1)
+            except queue.Empty:
+                # A worker that died without saying so fails its remaining jobs
+                for index in list(running):
+                    p = processes[index]
+                    if p.exitcode is not None:
+                        running.discard(index)
+                        for job in pending.pop(index).values():
+                            yield job, [], RuntimeError(f"worker exited with code {p.exitcode}")
+                continue
+
+            if kind == "exit":
+                running.discard(module)
+                pending.pop(module, None)
+                if payload and metrics is not None:
+                    metrics.merge(payload)
+                continue
+            job = None
+            for left in pending.values():
+                job = left.pop((module, target), None)
+                if job:
+                    break
+            job = job or Job(module, None, target)
+            if kind == "error":
+                yield job, [], RuntimeError(payload)
+            else:
+                yield job, [Finding.from_dict(f) for f in payload], None
+    finally:
+        for p in processes.values():
+            if p.is_alive():
+                p.terminate()
+            p.join()
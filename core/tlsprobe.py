@@ -0,0 +1,109 @@
+import hashlib
+import ssl
+import threading
+import time
+from datetime import datetime, timezone
+from core.portstate import connect
+from core import metrics
+
+# One shared context: TLS sessions can only be resumed on the context
+# that created them. Created on first use, loading the CA store is slow.
+_context = None
+
+_results = {}
+_sessions = {}
+_locks = {}
+_lock = threading.Lock()
+
+
+def _default_context():
+    global _context
+    if _context is None:
+        with _lock:
+            if _context is None:
+                _context = ssl.create_default_context()
+    return _context
+
+
+class TLSResult:
+    """Outcome of one TLS handshake with (host, port, sni)."""
+
+    def __init__(self, host, port, sni):
+        self.host = host
+        self.port = port
+        self.sni = sni
+        self.protocol = None
+        self.cipher = None
+        self.cert = None
+        self.chain = []
+        self.not_after = None
+        self.fingerprint = None
+        self.resumed = False
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {
+            "host": self.host,
+            "port": self.port,
+            "sni": self.sni,
+            "protocol": self.protocol,
+            "cipher": self.cipher,
+            "not_after": self.not_after.isoformat() if self.not_after else None,
+            "fingerprint": self.fingerprint,
+            "error": str(self.error) if self.error else None
+        }
+
+
+def _handshake(host, port, sni, timeout):
+    key = (host.lower(), port, sni)
+    result = TLSResult(host, port, sni)
+    start = time.perf_counter()
+    try:
+        sock = connect((host, port), timeout=timeout)
+        with _default_context().wrap_socket(sock, server_hostname=sni,
+                                  session=_sessions.get(key)) as ssock:
+            result.protocol = ssock.version()
+            result.cipher = ssock.cipher()
+            result.cert = ssock.getpeercert()
+            der = ssock.getpeercert(binary_form=True)
+            # get_verified_chain() only exists on Python 3.13+
+            chain = getattr(ssock, "get_verified_chain", None)
+            result.chain = list(chain()) if chain else [der]
+            result.fingerprint = hashlib.sha256(der).hexdigest() if der else None
+            result.resumed = ssock.session_reused
+            if ssock.session is not None:
+                _sessions[key] = ssock.session
+        if result.cert and result.cert.get("notAfter"):
+            seconds = ssl.cert_time_to_seconds(result.cert["notAfter"])
+            result.not_after = datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+    except Exception as e:
+        result.error = e
+    metrics.observe("tls.handshake", host, start, metrics.classify(result.error))
+    return result
+
+
+def probe_tls(host, port=443, sni=None, timeout=5, refresh=False):
+    """
+    Returns the TLSResult for (host, port, sni), handshaking at most once
+    per run. Callers racing on the same key wait for the first handshake.
+    `refresh` forces a new handshake (resumed from the cached session).
+    """
+    sni = sni or host
+    key = (host.lower(), port, sni)
+    with _lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        if refresh or key not in _results:
+            _results[key] = _handshake(host, port, sni, timeout)
+        return _results[key]
+
+
+def clear():
+    with _lock:
+        _results.clear()
+        _sessions.clear()
+        _locks.clear()
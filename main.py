@@ -1,19 +1,25 @@
-from core.report import generate_pdf, export_json
-from plugins.plugin_loader import load_plugins
-import argparse, sys
-
-from modules.web import web_scan
-from modules.api import api_scan
-from modules.ad import ad_scan
-from modules.ports import port_scan
-from modules.tls import tls_check
-from modules.wireless import wireless_scan
+# Scan modules, report backends and plugins are imported on selection
+# through core.registry: keep heavy imports (reportlab, requests, rich
+# widgets) out of this module's top level
+from core.registry import SCAN_MODULES, REPORTS
+from core.export import generate_pdf_background
+from plugins.plugin_loader import load_plugins, plugin_jobs
+from core.config_loader import load_config, watch_config
+from core.engine import Scheduler, Job
+from core.resolver import prefetch
+from core.cache import ResultCache, enable_cache, get_cache, diff_runs, in_scope
+from core.checkpoint import Checkpoint
+from core.metrics import enable_metrics
+from core.findings import (FindingsManager, FindingsSink, FindingsAggregator, FindingsTee,
+                           read_findings, aggregate, GROUP_THRESHOLD)
+from core.finding import Finding
+from datetime import datetime
+from contextlib import nullcontext
+from functools import partial
+from itertools import chain
+import argparse, json, os, sys
 
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.progress import Progress, BarColumn, TimeRemainingColumn, TextColumn
-from rich.live import Live
 
 console = Console()
 
@@ -27,18 +33,21 @@ def banner():
 
 
 # =========================
-# Tag findings with module
+# Tag findings with module (and target)
 # =========================
-def tag_module(findings, module_name):
+def tag_module(findings, module_name, target=None):
     for f in findings:
-        f.module = module_name
+        f.module = sys.intern(module_name)
+        if f.target is None:
+            f.target = target
     return findings
 
 
 # =========================
 # Display summary table
 # =========================
-def display_summary(findings):
+def display_summary(findings, grouped=False):
+    from rich.table import Table
     if not findings:
         console.print("[bold green]No vulnerabilities found![/bold green]\n")
         return
@@ -50,7 +59,7 @@ def display_summary(findings):
     table.add_column("Module", style="bold")
     table.add_column("Title", style="bold")
     table.add_column("Severity")
-    table.add_column("Description")
+    table.add_column("Affected Targets" if grouped else "Description")
     table.add_column("Fix / Recommendation")
 
     severity_colors = {
@@ -63,27 +72,99 @@ def display_summary(findings):
 
     for f in findings_sorted:
         table.add_row(
-            getattr(f, "module", "Unknown"),
+            f.module or "Unknown",
             f.title,
             f"[{severity_colors.get(f.severity, 'white')}]{f.severity}[/{severity_colors.get(f.severity, 'white')}]",
-            f.desc,
+            f.affected() if grouped else f.desc,
             f.fix
         )
 
     console.print(table)
 
 
+def use_grouped_view(view, count):
+    return view == "grouped" or (view == "auto" and count > GROUP_THRESHOLD)
+
+
 # =========================
-# Run a module on multiple targets
+# Where the scan's time went
 # =========================
-def run_module(module_name, func, targets):
-    results = []
-    for t in targets:
-        try:
-            res = func(t)
-            results += tag_module(res, module_name)
-        except Exception as e:
-            console.print(f"[red]Error scanning {t}: {e}[/red]")
+def report_metrics(metrics, args):
+    from rich.table import Table
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    metrics.write_prometheus(args.metrics_out or f"reports/Kryphorix_Metrics_{stamp}.prom")
+    metrics.write_trace(args.trace_out or f"reports/Kryphorix_Trace_{stamp}.json")
+
+    table = Table(title="Slowest Hosts")
+    for column in ("Host", "Job Time (s)", "Share", "Timeouts", "Errors"):
+        table.add_column(column)
+    for host, seconds, share, timeouts, errors in metrics.top_hosts():
+        table.add_row(host, f"{seconds:.2f}", f"{share:.0%}", str(timeouts), str(errors))
+    console.print(table)
+
+
+# =========================
+# Diff against the previous recorded run
+# =========================
+def report_changes(stream, cache, scanned, show=True):
+    """
+    Diffs this run against the last recorded one. Only the (module, target)
+    jobs in `scanned` can resolve findings; findings of jobs this run
+    didn't cover are carried over into the recorded run.
+    """
+    previous = cache.last_run()
+    new, resolved = diff_runs(previous, read_findings(stream), scanned)
+    kept = (Finding.from_dict(d) for d in previous.values() if not in_scope(d, scanned))
+    cache.record_run(chain(read_findings(stream), kept))
+    if not show:
+        return
+    if not previous:
+        console.print("[bold]No previous run recorded; this scan is the new baseline[/bold]")
+        return
+
+    resolved = [Finding.from_dict(d) for d in resolved]
+    console.print(f"[bold]Changes since last run: {len(new)} new, {len(resolved)} resolved[/bold]")
+    for title, findings in (("New Findings", new), ("Resolved Findings", resolved)):
+        if findings:
+            console.print(f"\n[bold cyan]{title}[/bold cyan]")
+            display_summary(findings)
+
+    os.makedirs("reports", exist_ok=True)
+    filename = f"reports/Kryphorix_Diff_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, "w") as out:
+        json.dump({"new": [f.to_dict() for f in new],
+                   "resolved": [f.to_dict() for f in resolved]}, out, indent=4)
+    console.print(f"[bold]Diff saved: {filename}[/bold]")
+
+
+# =========================
+# Run (module, target) jobs on the shared scheduler
+# =========================
+def run_local(jobs, threads, per_host):
+    return Scheduler(threads, per_host).run(jobs)
+
+
+def run_jobs(jobs, threads=None, per_host=None, on_done=None, sink=None, checkpoint=None, runner=None):
+    """
+    Runs jobs and collects their findings. `runner(jobs, threads, per_host)`
+    yields (job, findings, error); the default is a local Scheduler.
+    """
+    config = load_config()
+    threads = threads or config.get("threads", 5)
+    per_host = per_host or config.get("per_host", 2)
+    completed = (runner or run_local)(jobs, threads=threads, per_host=per_host)
+    results = sink if sink is not None else FindingsManager()
+    for job, res, error in completed:
+        if error:
+            # Failed jobs stay out of the checkpoint so a resume retries them
+            console.print(f"[red]Error scanning {job.target}: {error}[/red]")
+        else:
+            res = tag_module(res, job.module, job.target)
+            results.extend(res)
+            if checkpoint is not None:
+                checkpoint.done(job.module, job.target, res)
+        if on_done:
+            on_done(job)
     return results
 
 
@@ -97,38 +178,232 @@ def parse_targets(value):
 # =========================
 # CLI Mode
 # =========================
+# Arguments that define a run's job list, saved with its checkpoint
+JOB_OPTIONS = ("web", "api", "ad", "ports", "ports_range", "tls", "tls_enum", "wifi", "plugins")
+
+
+def port_spec(value):
+    # Validated up front, kept as text so it stays small in the checkpoint
+    from modules.ports import parse_ports
+    try:
+        parse_ports(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid port spec {value!r}: {e}")
+    return value
+
+
+def report_formats(value):
+    formats = parse_targets(value)
+    for fmt in formats:
+        if fmt not in REPORTS:
+            raise ValueError(f"unknown report format {fmt!r}")
+    return formats
+
+
+def job_func(module, options):
+    """The callable a job of `module` runs, given the scan options named in JOB_OPTIONS."""
+    if module.startswith("Plugin:"):
+        plugins = load_plugins([module[len("Plugin:"):]])
+        if not plugins:
+            raise KeyError(f"unknown plugin: {module}")
+        return plugins[0]
+    func = SCAN_MODULES.get(module)
+    if module == "Ports" and options.get("ports_range"):
+        return partial(func, ports=options["ports_range"])
+    if module == "TLS" and options.get("tls_enum"):
+        return partial(func, enum=True)
+    return func
+
+
+def build_jobs(args):
+    options = {key: getattr(args, key) for key in JOB_OPTIONS}
+    targets = {
+        "web": parse_targets(args.web or ""),
+        "api": parse_targets(args.api or ""),
+        "ad": parse_targets(args.ad or ""),
+        "ports": parse_targets(args.ports or ""),
+        "tls": parse_targets(args.tls or ""),
+        "wireless": ["local"] if args.wifi else [],
+    }
+
+    jobs = []
+    for module, kind in (("Web", "web"), ("API", "api"), ("AD", "ad"), ("Ports", "ports"),
+                         ("TLS", "tls"), ("Wireless", "wireless")):
+        if targets[kind]:
+            func = job_func(module, options)
+            jobs += [Job(module, func, t) for t in targets[kind]]
+
+    # Plugins share the pool with the built-in modules
+    plugins = load_plugins(None if args.plugins is None else parse_targets(args.plugins))
+    return jobs + plugin_jobs(plugins, targets)
+
+
+def split_live(jobs):
+    """Runs host discovery over the jobs' hosts; returns (jobs on live hosts, jobs on dead hosts)."""
+    # Loaded here: discovery pulls in asyncio
+    from core.discovery import discover, target_port
+    probed = [job for job in jobs if job.target != "local"]
+    console.print(f"[bold]Discovering {len({job.host for job in probed})} hosts...[/bold]")
+    alive = discover((job.host, target_port(job.target)) for job in probed)
+    dead = sorted(host for host, up in alive.items() if not up)
+    if dead:
+        console.print(f"[yellow]{len(dead)} of {len(alive)} hosts did not answer: {', '.join(dead[:10])}"
+                      f"{' ...' if len(dead) > 10 else ''}[/yellow]")
+    dead = set(dead)
+    return [job for job in jobs if job.host not in dead], [job for job in jobs if job.host in dead]
+
+
+def open_checkpoint(args):
+    cfg = load_config()["checkpoint"]
+    if args.resume:
+        checkpoint = Checkpoint(cfg["path"], args.resume,
+                                batch_size=cfg["batch_size"], interval=cfg["interval"])
+        for key, value in checkpoint.options.items():
+            setattr(args, key, value)
+        return checkpoint
+    return Checkpoint(cfg["path"], options={key: getattr(args, key) for key in JOB_OPTIONS},
+                      batch_size=cfg["batch_size"], interval=cfg["interval"])
+
+
 def cli_mode(args):
-    findings = []
+    if args.listen:
+        from core.distributed import check_listen
+        try:
+            check_listen(args.listen, args.token or load_config()["distributed"]["token"])
+        except ValueError as e:
+            console.print(f"[red]Cannot coordinate: {e}[/red]")
+            return
+    try:
+        checkpoint = open_checkpoint(args)
+    except ValueError as e:
+        console.print(f"[red]Cannot resume: {e}[/red]")
+        return
 
-    if args.web:
-        findings += run_module("Web", web_scan, parse_targets(args.web))
-    if args.api:
-        findings += run_module("API", api_scan, parse_targets(args.api))
-    if args.ad:
-        findings += run_module("AD", ad_scan, parse_targets(args.ad))
-    if args.ports:
-        findings += run_module("Ports", port_scan, parse_targets(args.ports))
-    if args.tls:
-        findings += run_module("TLS", tls_check, parse_targets(args.tls))
-    if args.wifi:
-        findings += run_module("Wireless", wireless_scan, ["local"])
-
-    # Run plugins
-    for plugin in load_plugins():
-        plugin_results = plugin()
-        findings += tag_module(plugin_results, "Plugin")
-
-    # Display summary & generate reports
+    with checkpoint:
+        jobs = build_jobs(args)
+        if args.resume:
+            console.print(f"[bold]Resuming run {checkpoint.run_id}: "
+                          f"{len(checkpoint)} of {len(jobs)} jobs already done[/bold]")
+            jobs = [job for job in jobs if not checkpoint.is_done(job.module, job.target)]
+        else:
+            console.print(f"[bold]Run {checkpoint.run_id} (resume with --resume {checkpoint.run_id})[/bold]")
+        run_scan(args, jobs, checkpoint)
+
+
+def job_runner(args, metrics=None):
+    """
+    Where jobs run: this process (None), --workers processes or --listen
+    remote workers. The coordinator is returned as a context manager that
+    keeps its workers across batches.
+    """
+    if args.listen:
+        from core.distributed import Coordinator
+        cfg = load_config()["distributed"]
+        options = {key: getattr(args, key) for key in JOB_OPTIONS}
+        options["cache"] = get_cache() is not None
+        return Coordinator(args.listen, options, cfg["lease"], cfg["heartbeat"],
+                           args.token or cfg["token"], cfg["max_attempts"])
+    if args.workers > 1:
+        from core.shard import run_sharded
+        # Each worker process gets `threads` threads; findings come back per job
+        options = {"cache": get_cache() is not None, "metrics": metrics is not None,
+                   "trace_limit": load_config()["metrics"]["trace_limit"]}
+        return partial(run_sharded, workers=args.workers, options=options, metrics=metrics)
+    return None
+
+
+def worker_mode(args):
+    from core.distributed import run_worker
+
+    def setup(options):
+        if options.get("cache"):
+            enable_cache()
+
+    cfg = load_config()["distributed"]
+    threads = args.threads or load_config().get("threads", 5)
+    run_worker(args.worker, job_func, threads, args.token or cfg["token"], setup)
+
+
+def monitor_mode(args):
+    from modules.wireless import wifi_monitor
+    stream = args.findings_out or f"reports/Kryphorix_WiFi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    console.print(f"[bold]Monitoring Wi-Fi, streaming findings to {stream} (Ctrl+C to stop)[/bold]")
+    with FindingsSink(stream) as sink:
+        wifi_monitor(interval=args.wifi_interval, duration=args.wifi_duration,
+                     on_findings=lambda found: sink.extend(tag_module(found, "Wireless")))
+
+    findings = list(read_findings(stream))
     display_summary(findings)
     if findings:
-        generate_pdf(findings)
-        export_json(findings)
+        for fmt in args.report or report_formats(load_config()["report_format"]):
+            REPORTS.get(fmt)(findings)
+
+
+def run_scan(args, jobs, checkpoint):
+    # --diff alone records runs without reusing cached results
+    cache = None
+    if args.incremental or load_config()["cache"]["enabled"]:
+        cache = enable_cache()
+    elif args.diff:
+        cache = ResultCache(load_config()["cache"]["path"])
+
+    metrics = None
+    if args.metrics_out or args.trace_out or load_config()["metrics"]["enabled"]:
+        metrics = enable_metrics(load_config()["metrics"]["trace_limit"])
+
+    if load_config()["dns"]["prefetch"]:
+        prefetch(job.host for job in jobs if job.target != "local")
+
+    # Live hosts first; dead ones are dropped, or scanned last with --force-scan
+    batches = [jobs]
+    if args.discover or load_config()["discovery"]["enabled"]:
+        live, dead = split_live(jobs)
+        batches = [live, dead] if args.force_scan else [live]
+
+    stream = args.findings_out or f"reports/Kryphorix_Findings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    console.print(f"[bold]Streaming findings to {stream}[/bold]")
+    aggregator = FindingsAggregator()
+    runner = job_runner(args, metrics)
+    session = runner if hasattr(runner, "__enter__") else nullcontext()
+    with FindingsSink(stream) as sink, session:
+        results = FindingsTee(sink, aggregator)
+        # Findings of jobs completed before the interruption
+        results.extend(checkpoint.findings())
+        for batch in batches:
+            run_jobs(batch, threads=args.threads, per_host=args.per_host, sink=results,
+                     checkpoint=checkpoint, runner=runner)
+        checkpoint.finish()
+
+    # Display summary & generate reports; the expanded view is read back
+    # from the streamed file, the grouped one comes from the aggregator
+    grouped = use_grouped_view(args.view, aggregator.total)
+    findings = aggregator.groups() if grouped else list(read_findings(stream))
+    display_summary(findings, grouped)
+    if findings:
+        for fmt in args.report or report_formats(load_config()["report_format"]):
+            if fmt == "pdf" and args.pdf_background:
+                generate_pdf_background(stream, grouped=grouped)
+                console.print("[bold]PDF report is rendering in the background[/bold]")
+            elif fmt == "pdf":
+                REPORTS.get("pdf")(findings, grouped=grouped)
+            else:
+                REPORTS.get(fmt)(findings if grouped else read_findings(stream))
+
+    if metrics:
+        report_metrics(metrics, args)
+
+    if cache:
+        report_changes(stream, cache, checkpoint.completed(), show=args.diff)
 
 
 # =========================
 # Menu Mode
 # =========================
 def menu_mode():
+    from rich.panel import Panel
+    from rich.progress import Progress, BarColumn, TimeRemainingColumn, TextColumn
+    from rich.live import Live
+
     banner()
     console.print(Panel(
         "[bold]Menu Mode[/bold]\n"
@@ -142,21 +417,21 @@ def menu_mode():
 
     if choice == "1":
         targets = input("Web URLs (comma-separated): ").split(",")
-        scan_tasks.append(("Web", web_scan, parse_targets(",".join(targets))))
+        scan_tasks.append(("Web", parse_targets(",".join(targets))))
     elif choice == "2":
         targets = input("API URLs (comma-separated): ").split(",")
-        scan_tasks.append(("API", api_scan, parse_targets(",".join(targets))))
+        scan_tasks.append(("API", parse_targets(",".join(targets))))
     elif choice == "3":
         targets = input("Domain Controller IPs/Hosts (comma-separated): ").split(",")
-        scan_tasks.append(("AD", ad_scan, parse_targets(",".join(targets))))
+        scan_tasks.append(("AD", parse_targets(",".join(targets))))
     elif choice == "4":
         targets = input("Hosts to scan ports (comma-separated): ").split(",")
-        scan_tasks.append(("Ports", port_scan, parse_targets(",".join(targets))))
+        scan_tasks.append(("Ports", parse_targets(",".join(targets))))
     elif choice == "5":
         targets = input("Hosts to check TLS/SSL (comma-separated): ").split(",")
-        scan_tasks.append(("TLS", tls_check, parse_targets(",".join(targets))))
+        scan_tasks.append(("TLS", parse_targets(",".join(targets))))
     elif choice == "6":
-        scan_tasks.append(("Wireless", wireless_scan, ["local"]))
+        scan_tasks.append(("Wireless", ["local"]))
     elif choice == "0":
         sys.exit()
     else:
@@ -176,28 +451,26 @@ def menu_mode():
     )
 
     with Live(console=console, refresh_per_second=4) as live:
-        for name, func, targets in scan_tasks:
+        for name, targets in scan_tasks:
             if not targets:
                 continue
-            task_id = progress.add_task("", total=len(targets), module=name)
+            jobs = [Job(name, SCAN_MODULES.get(name), t) for t in targets]
+            jobs += plugin_jobs(load_plugins(), {name.lower(): targets})
+            task_id = progress.add_task("", total=len(jobs), module=name)
             live.update(Panel(f"[bold cyan]Starting {name} scans[/bold cyan]", title="KryPhorix Dashboard"))
-            for t in targets:
-                try:
-                    res = func(t)
-                    findings += tag_module(res, name)
-                except Exception as e:
-                    console.print(f"[red]Error scanning {t}: {e}[/red]")
-                progress.advance(task_id)
+            findings += run_jobs(jobs, on_done=lambda job: progress.advance(task_id)).findings
             live.update(Panel(f"[bold green]{name} scans complete![/bold green]", title="KryPhorix Dashboard"))
 
-    # Run plugins
-    for plugin in load_plugins():
-        findings += tag_module(plugin(), "Plugin")
-
-    display_summary(findings)
+    grouped = use_grouped_view("auto", len(findings))
+    if grouped:
+        findings = aggregate(findings)
+    display_summary(findings, grouped)
     if findings:
-        generate_pdf(findings)
-        export_json(findings)
+        for fmt in report_formats(load_config()["report_format"]):
+            if fmt == "pdf":
+                REPORTS.get("pdf")(findings, grouped=grouped)
+            else:
+                REPORTS.get(fmt)(findings)
 
 
 # =========================
@@ -209,8 +482,48 @@ def parse_args():
     parser.add_argument("--api", help="Scan API endpoints (comma-separated)")
     parser.add_argument("--ad", help="Scan Active Directory hosts (comma-separated)")
     parser.add_argument("--ports", help="Scan open ports (comma-separated)")
-    parser.add_argument("--tls", help="Check TLS/SSL hosts (comma-separated)")
+    parser.add_argument("--ports-range", type=port_spec,
+                        help="Ports for --ports: ranges, lists or topN (e.g. 1-65535, 22,80,443, top100)")
+    parser.add_argument("--tls", help="Check TLS/SSL hosts (comma-separated, host or host:port)")
+    parser.add_argument("--tls-enum", action="store_true",
+                        help="Enumerate every protocol version and weak cipher group accepted by --tls hosts")
     parser.add_argument("--wifi", action="store_true", help="Scan available Wi-Fi networks")
+    parser.add_argument("--wifi-monitor", action="store_true",
+                        help="Poll Wi-Fi networks until Ctrl+C, reporting only changes")
+    parser.add_argument("--wifi-interval", type=float,
+                        help="Seconds between --wifi-monitor polls (default: config modules.wireless.interval)")
+    parser.add_argument("--wifi-duration", type=float, help="Stop --wifi-monitor after this many seconds")
+    parser.add_argument("--view", choices=["auto", "grouped", "expanded"], default="auto",
+                        help=f"Report layout: one row per finding, or one per (module, check, title) "
+                             f"with affected targets (auto groups above {GROUP_THRESHOLD} findings)")
+    parser.add_argument("--report", type=report_formats,
+                        help=f"Report formats to write, comma-separated: {', '.join(REPORTS.names())} "
+                             f"(default: config report_format)")
+    parser.add_argument("--plugins", help="Plugins to run, comma-separated (default: all, '' for none)")
+    parser.add_argument("--pdf-background", action="store_true",
+                        help="Render the PDF report in a detached process and return immediately")
+    parser.add_argument("--findings-out", help="JSON Lines file findings are streamed to during the scan")
+    parser.add_argument("--metrics-out", help="Write per-probe latency/outcome histograms as a Prometheus textfile")
+    parser.add_argument("--trace-out", help="Write a Chrome trace (chrome://tracing, Perfetto) of the run's probes")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse cached per-target results that are still fresh (see config cache.ttl)")
+    parser.add_argument("--diff", action="store_true",
+                        help="Report findings that are new or resolved since the last recorded run")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume an interrupted run, skipping the jobs it already completed")
+    parser.add_argument("--discover", action="store_true",
+                        help="Check which hosts are up first and skip the ones that don't answer")
+    parser.add_argument("--force-scan", action="store_true",
+                        help="With discovery, still scan hosts that didn't answer, after the live ones")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Shard jobs by host across this many processes (default: 1, no sharding)")
+    parser.add_argument("--listen", metavar="ADDRESS",
+                        help="Coordinate: hand jobs to --worker processes connecting to host:port or unix:/path")
+    parser.add_argument("--worker", metavar="ADDRESS",
+                        help="Run jobs for the coordinator at host:port or unix:/path")
+    parser.add_argument("--token", help="Shared secret workers present to the coordinator (default: config distributed.token)")
+    parser.add_argument("--threads", type=int, help="Worker threads shared by all modules (default: config threads)")
+    parser.add_argument("--per-host", type=int, help="Max concurrent jobs against one host (default: config per_host)")
     return parser.parse_args()
 
 
@@ -219,9 +532,15 @@ def parse_args():
 # =========================
 if __name__ == "__main__":
     args = parse_args()
+    load_config()
+    watch_config()
     banner()
     if len(sys.argv) == 1:
         menu_mode()
+    elif args.worker:
+        worker_mode(args)
+    elif args.wifi_monitor:
+        monitor_mode(args)
     else:
         cli_mode(args)
 
@@ -2,6 +2,8 @@ import socket
 from core.ui import banner, section, info, good, warn, bad
 from core.finding import Finding
 from core.findings import FindingsManager
+from core.config_loader import module_config
+from core.portstate import OPEN, port_state
 
 AD_PORTS = {
     88: "Kerberos",
@@ -18,41 +20,44 @@ def ad_scan(target=None):
         target = input("Enter Domain Controller IP: ").strip()
 
     findings = FindingsManager()
+    timeout = module_config("ad")["timeout"]
     info(f"Target Domain Controller: {target}")
     section("CHECKING AD SERVICE EXPOSURE")
 
     for port, service in AD_PORTS.items():
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(3)
         try:
-            result = s.connect_ex((target, port))
-            if result == 0:
-                good(f"{service} (Port {port}) is OPEN")
-                if port in [389,445,3268]:
-                    findings.add(Finding(
-                        f"{service} Service Exposed",
-                        "High",
-                        f"{service} service is accessible externally on port {port}",
-                        "Restrict AD services to internal network only"
-                    ))
-            else:
-                info(f"{service} (Port {port}) is closed")
-        except Exception as e:
+            state = port_state((target, port), timeout, check="ad.connect")
+        except socket.gaierror as e:
             warn(f"Error checking {service}: {e}")
-        finally:
-            s.close()
+            continue
+        if state == OPEN:
+            good(f"{service} (Port {port}) is OPEN")
+            if port in [389,445,3268]:
+                findings.add(Finding(
+                    f"{service} Service Exposed",
+                    "High",
+                    f"{service} service is accessible externally on port {port}",
+                    "Restrict AD services to internal network only",
+                    check_id="ad.service_exposed"
+                ))
+        else:
+            info(f"{service} (Port {port}) is {state}")
 
+    # The exposure loop already recorded 445: no second connection
     section("SMB SIGNING CHECK (basic detection)")
     try:
-        s = socket.create_connection((target, 445), timeout=3)
-        s.close()
+        smb = port_state((target, 445), timeout, check="ad.smb")
+    except socket.gaierror:
+        smb = None
+    if smb == OPEN:
         findings.add(Finding(
             "SMB Service Detected",
             "Medium",
             "SMB is exposed. Ensure SMB signing and security policies are enforced.",
-            "Enable SMB signing and restrict SMB access"
+            "Enable SMB signing and restrict SMB access",
+            check_id="ad.smb_exposed"
         ))
-    except:
+    else:
         info("SMB not reachable")
 
     section("SUMMARY OF FINDINGS")
@@ -1,8 +1,11 @@
-import requests
 from urllib.parse import urlparse
 from core.ui import banner, section, info, good, warn, bad
 from core.finding import Finding
 from core.findings import FindingsManager
+from core.scanner import http_get, http_options, probe_paths, Throttle
+from core.config_loader import module_config
+
+SENSITIVE_PATHS = ["/admin","/debug","/config","/.git"]
 
 def api_scan(url=None):
     banner()
@@ -18,12 +21,14 @@ def api_scan(url=None):
 
     info(f"Target API: {url}")
     findings = FindingsManager()
-    headers = {"User-Agent": "Kryphorix Scanner"}
+    cfg = module_config("api")
+    throttle = Throttle(cfg["rate_limit"])
 
     # OPTIONS request & CORS
     section("OPTIONS Request & CORS Check")
     try:
-        r = requests.options(url, headers=headers, timeout=(10,30))
+        throttle.wait()
+        r = http_options(url, timeout=cfg["options_timeout"], check="api.options")
         good(f"Status Code: {r.status_code}")
         cors_headers = r.headers.get("Access-Control-Allow-Headers","")
         if "Authorization" not in cors_headers:
@@ -31,7 +36,8 @@ def api_scan(url=None):
                 "Weak Auth / CORS Misconfig",
                 "High",
                 "Authorization header not restricted by CORS",
-                "Restrict Authorization header in CORS policy"
+                "Restrict Authorization header in CORS policy",
+                check_id="api.cors_authorization"
             ))
         else:
             good("Authorization header properly restricted")
@@ -41,24 +47,22 @@ def api_scan(url=None):
     # GET request check
     section("Basic GET Request Check")
     try:
-        r = requests.get(url, headers=headers, timeout=10)
+        throttle.wait()
+        r = http_get(url, timeout=cfg["timeout"], check="api.get")
         good(f"Status Code: {r.status_code}")
         server = r.headers.get("Server", "Unknown")
         good(f"Server Info: {server}")
 
-        sensitive_paths = ["/admin","/debug","/config","/.git"]
-        for path in sensitive_paths:
-            try:
-                res = requests.get(url+path, headers=headers, timeout=5)
-                if res.status_code == 200:
-                    findings.add(Finding(
-                        f"Exposed API Path: {path}",
-                        "Medium",
-                        f"{url}{path} is publicly accessible",
-                        "Restrict access or remove unnecessary endpoints"
-                    ))
-            except:
-                continue
+        exposed = probe_paths(url, SENSITIVE_PATHS, cfg["path_timeout"], cfg["threads"], throttle,
+                              check="api.paths")
+        for path in exposed:
+            findings.add(Finding(
+                f"Exposed API Path: {path}",
+                "Medium",
+                f"{url}{path} is publicly accessible",
+                "Restrict access or remove unnecessary endpoints",
+                check_id="api.exposed_path"
+            ))
     except Exception as e:
         warn(f"GET request check failed: {e}")
 
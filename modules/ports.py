@@ -1,7 +1,20 @@
+import asyncio
+import errno
+import hashlib
 import socket
+import time
+from functools import lru_cache
 from core.finding import Finding
 from core.findings import FindingsManager
-from core.ui import banner, section, info, good, warn, bad
+from core.ui import banner, section, info, good, bad
+from core.config_loader import load_config, module_config
+from core.engine import Throttle
+from core.resolver import getaddrinfo
+from core.cache import get_cache
+from core.rtt import get_rtt
+from core.portstate import OPEN, CLOSED, FILTERED, get_port_states
+from core.fingerprint import identify, read_banner
+from core import adaptive, metrics
 
 COMMON_PORTS = {
     21: "FTP", 22: "SSH", 23: "Telnet", 25: "SMTP",
@@ -9,38 +22,281 @@ COMMON_PORTS = {
     443: "HTTPS", 445: "SMB", 3306: "MySQL", 3389: "RDP", 5900: "VNC"
 }
 
-def port_scan(host=None):
+RISKY_PORTS = [21, 23, 25, 445, 3389]
+
+# Most frequently open TCP ports, most common first (used by "topN")
+TOP_PORTS = [
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080,
+    1723, 111, 995, 993, 5900, 1025, 587, 8888, 199, 1720, 465, 548, 113, 81,
+    6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554, 26, 1433,
+    49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153,
+    8081, 2049, 88, 79, 5800, 106, 2121, 1110, 49155, 6000, 513, 990, 5357,
+    427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009,
+    7070, 5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028,
+    873, 1755, 2717, 4899, 9100, 119, 37
+]
+
+
+IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY,
+               getattr(errno, "WSAEWOULDBLOCK", -1)}
+
+PROBE_OUTCOMES = {OPEN: metrics.OK, CLOSED: metrics.REFUSED, FILTERED: metrics.TIMEOUT}
+
+# A silent drop looks the same as a firewall filtering the port, so filtered
+# probes don't shrink the window; it adapts to answers and local errors only
+PROBE_SIGNALS = {OPEN: adaptive.SUCCESS, CLOSED: adaptive.SUCCESS, FILTERED: adaptive.NEUTRAL}
+
+# A probe that runs out of local sockets (EMFILE, ENOBUFS, ...) is retried
+# after a backoff doubling from the first to the second delay (seconds);
+# after LOCAL_RETRIES retries the error is raised
+LOCAL_BACKOFF = (0.01, 1.0)
+LOCAL_RETRIES = 20
+
+# Per-port lines are only printed for short port lists
+VERBOSE_LIMIT = 32
+
+
+def parse_ports(spec):
+    """
+    Parses a port specification such as "22,80,8000-8100" or "top100"
+    into a sorted list of unique ports.
+    """
+    ports = set()
+    for token in str(spec).split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        if token.startswith("top"):
+            count = int(token[3:] or len(TOP_PORTS))
+            if count > len(TOP_PORTS):
+                raise ValueError(f"{token}: only {len(TOP_PORTS)} ports known")
+            ports.update(TOP_PORTS[:count])
+        elif "-" in token:
+            start, end = token.split("-", 1)
+            ports.update(range(int(start), int(end) + 1))
+        else:
+            ports.add(int(token))
+
+    if not ports:
+        raise ValueError(f"no ports in '{spec}'")
+    if min(ports) < 1 or max(ports) > 65535:
+        raise ValueError(f"ports out of range in '{spec}'")
+    return sorted(ports)
+
+
+@lru_cache(maxsize=None)
+def service_name(port):
+    if port in COMMON_PORTS:
+        return COMMON_PORTS[port]
+    try:
+        return socket.getservbyport(port, "tcp").upper()
+    except OSError:
+        return "Unknown"
+
+
+def _settle(fut, value):
+    if not fut.done():
+        fut.set_result(value)
+
+
+async def _probe(loop, family, addr, timeout, keep=False):
+    # Raw non-blocking connect: localhost/LAN answers often arrive before the
+    # first await, and asyncio.wait_for costs a task per probe.
+    # Returns (state, socket); with `keep`, an open port's socket is left
+    # connected for the caller to read from and close
+    s = socket.socket(family, socket.SOCK_STREAM)
+    s.setblocking(False)
+    try:
+        err = s.connect_ex(addr)
+        if err in IN_PROGRESS:
+            fut = loop.create_future()
+            loop.add_writer(s.fileno(), _settle, fut, True)
+            timer = loop.call_later(timeout, _settle, fut, False)
+            try:
+                connected = await fut
+            finally:
+                loop.remove_writer(s.fileno())
+                timer.cancel()
+            if not connected:
+                return FILTERED, None
+            err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+
+        if err == 0:
+            if keep:
+                sock, s = s, None
+                return OPEN, sock
+            return OPEN, None
+        if err == errno.ECONNREFUSED:
+            return CLOSED, None
+        if err in adaptive.LOCAL_ERRNOS:
+            raise OSError(err, errno.errorcode.get(err, "local error"))
+        return FILTERED, None
+    finally:
+        if s is not None:
+            s.close()
+
+
+async def scan_ports(host, ports, concurrency=500, timeout=2, throttle=None, check="ports.connect",
+                     banners=None):
+    """
+    Connect-scans `ports` on `host` with at most `concurrency` probes in
+    flight and returns a {port: "open"|"closed"|"filtered"} dict. With
+    adaptive control on, the in-flight count also stays within the host's
+    and the global AIMD windows. With RTT estimation on, `timeout` is the
+    ceiling of the host's measured connect timeout.
+
+    Given a `banners` dict, the banner of each open port is read on the
+    probe's own connection and stored in it by port.
+    """
+    loop = asyncio.get_running_loop()
+    # Resolve once up front, otherwise every sock_connect resolves again
+    infos = await loop.run_in_executor(None, getaddrinfo, host, 0)
+    family, _, _, _, sockaddr = infos[0]
+
+    results = {}
+    pending = iter(ports)
+    # One series per scan; per-port trace events would swamp the timeline
+    active = metrics.get_metrics()
+    series = active.series(check, host) if active else None
+    limiter = adaptive.get_limiter()
+    rtt = get_rtt()
+    known = get_port_states()
+    grab = load_config()["fingerprint"] if banners is not None else None
+
+    async def probe(addr, wait):
+        # One connect, inside an adaptive slot when enabled, retried while
+        # local sockets run out; returns the state and the connect time.
+        # An open port's banner is read on the same connection before the
+        # slot is released, so reads count against the same limits
+        delay = LOCAL_BACKOFF[0]
+        for attempt in range(LOCAL_RETRIES + 1):
+            ticket = None
+            if limiter:
+                ticket = limiter.try_acquire(host, "tcp") or await limiter.acquire_async(host, "tcp")
+            start = time.perf_counter()
+            try:
+                state, sock = await _probe(loop, family, addr, wait, keep=grab is not None)
+                break
+            except OSError as e:
+                local = e.errno in adaptive.LOCAL_ERRNOS
+                if ticket is not None:
+                    # Out of sockets here shrinks the global window
+                    limiter.release(ticket, adaptive.LOCAL if local else adaptive.NEUTRAL)
+                if not local or attempt == LOCAL_RETRIES:
+                    raise
+            # Says nothing about the port: wait for other probes to close
+            # their sockets and try it again
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOCAL_BACKOFF[1])
+        elapsed = time.perf_counter() - start
+        if sock is not None:
+            try:
+                banners[addr[1]] = await read_banner(loop, sock, addr[1], grab["banner_timeout"],
+                                                     grab["banner_bytes"])
+            finally:
+                sock.close()
+        if ticket is not None:
+            limiter.release(ticket, PROBE_SIGNALS[state])
+        return state, elapsed
+
+    async def worker():
+        for port in pending:
+            # Answered earlier in the run, by this or another module
+            state = known.get(host, port, timeout) if known is not None else None
+            if state is not None:
+                results[port] = state
+                continue
+            if throttle:
+                delay = throttle.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            addr = (sockaddr[0], port) + tuple(sockaddr[2:])
+            # Filtered under a shortened timeout: retry with a longer one
+            for wait in rtt.attempts(host, timeout) if rtt else (timeout,):
+                state, elapsed = await probe(addr, wait)
+                if series:
+                    series.observe(elapsed, PROBE_OUTCOMES[state])
+                if state != FILTERED:
+                    if rtt:
+                        rtt.sample(host, elapsed)
+                    break
+            results[port] = state
+            if known is not None:
+                # A filtered port is recorded with the longest wait it got
+                known.set(host, port, state, wait)
+
+    workers = max(1, min(concurrency, len(ports)))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return results
+
+
+def port_scan(host=None, ports=None):
     banner()
     if not host:
         host = input("Enter host to scan ports: ").strip()
 
+    if ports is None:
+        ports = list(COMMON_PORTS)
+    elif isinstance(ports, str):
+        ports = parse_ports(ports)
+
     section(f"PORT SCAN - {host}")
     findings = FindingsManager()
 
-    for port, service in COMMON_PORTS.items():
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(2)
+    cfg = module_config("ports")
+    throttle = Throttle(cfg["rate_limit"]) if cfg["rate_limit"] else None
+    cache = get_cache()
+    # The port list is part of the key so a top100 result never answers a full scan
+    check = "ports:" + hashlib.sha1(",".join(map(str, ports)).encode()).hexdigest()[:16]
+    states = cache.get("ports", host, check) if cache else None
+    banners = {} if load_config()["fingerprint"]["banners"] else None
+    if states is not None:
+        info("Reusing port states from the last scan")
+        states = {int(port): state for port, state in states.items()}
+        known = get_port_states()
+        if known is not None:
+            known.update(host, states, cfg["timeout"])
+    else:
         try:
-            result = s.connect_ex((host, port))
-            if result == 0:
-                good(f"{service} (Port {port}) is OPEN")
-                if port in [21,23,25,445,3389]:
-                    findings.add(Finding(
-                        f"Open {service} Service",
-                        "Medium",
-                        f"{service} is open on {host}:{port}. Exposed services can be exploited.",
-                        "Restrict access to internal network or secure service"
-                    ))
+            states = asyncio.run(scan_ports(host, ports, cfg["concurrency"], cfg["timeout"], throttle,
+                                            banners=banners))
+        except socket.gaierror as e:
+            bad(f"Could not resolve {host}: {e}")
+            return []
+        if cache:
+            cache.put("ports", host, check, states, ttl=cache.ttl("ports"))
+
+    verbose = len(ports) <= VERBOSE_LIMIT
+    for port in sorted(states):
+        state = states[port]
+        # getservbyport reads the services database on every call: only
+        # look up names for ports that get printed
+        if state == OPEN:
+            service = service_name(port)
+            products = identify(host, port, banner=banners.get(port) if banners else None)
+            if products:
+                good(f"{service} (Port {port}) is OPEN: {', '.join(map(str, products))}")
             else:
-                info(f"{service} (Port {port}) is closed")
-        except Exception as e:
-            warn(f"Error checking port {port}: {e}")
-        finally:
-            s.close()
+                good(f"{service} (Port {port}) is OPEN")
+            if port in RISKY_PORTS:
+                findings.add(Finding(
+                    f"Open {service} Service",
+                    "Medium",
+                    f"{service} is open on {host}:{port}. Exposed services can be exploited.",
+                    "Restrict access to internal network or secure service",
+                    check_id="ports.risky_service"
+                ))
+        elif verbose:
+            info(f"{service_name(port)} (Port {port}) is {state}")
+
+    counts = {OPEN: 0, CLOSED: 0, FILTERED: 0}
+    for state in states.values():
+        counts[state] += 1
+    info(f"{len(states)} ports scanned: {counts[OPEN]} open, "
+         f"{counts[CLOSED]} closed, {counts[FILTERED]} filtered")
 
     section("PORT SCAN SUMMARY")
     for sev,count in findings.summary().items():
         print(f"{sev}: {count}")
 
     return findings.findings
-
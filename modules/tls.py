@@ -1,47 +1,215 @@
-import ssl, socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlparse
 from core.finding import Finding
 from core.findings import FindingsManager
 from core.ui import banner, section, info, good, warn, bad
+from core.config_loader import module_config
+from core.portstate import connect
+from core.tlsprobe import probe_tls
+from core.cache import get_cache
+from core import metrics
 
-def tls_check(host=None):
+# (name reported by SSLSocket.version(), ssl.TLSVersion member, usable by local OpenSSL)
+PROTOCOLS = [
+    ("SSLv3", "SSLv3", ssl.HAS_SSLv3),
+    ("TLSv1", "TLSv1", ssl.HAS_TLSv1),
+    ("TLSv1.1", "TLSv1_1", ssl.HAS_TLSv1_1),
+    ("TLSv1.2", "TLSv1_2", ssl.HAS_TLSv1_2),
+    ("TLSv1.3", "TLSv1_3", ssl.HAS_TLSv1_3),
+]
+
+WEAK_PROTOCOLS = ["SSLv2", "SSLv3", "TLSv1", "TLSv1.1"]
+
+# group name -> (OpenSSL cipher string, severity)
+WEAK_CIPHER_GROUPS = {
+    "NULL": ("eNULL", "High"),
+    "Anonymous": ("aNULL", "High"),
+    "EXPORT": ("EXPORT", "High"),
+    "RC4": ("RC4", "Medium"),
+    "DES/3DES": ("DES:3DES", "Medium"),
+}
+
+
+def parse_target(target, default_port=443):
+    """Splits "host", "host:port" or "[v6]:port" into (host, port)."""
+    parsed = urlparse(target if "://" in target else "//" + target)
+    return parsed.hostname or target, parsed.port or default_port
+
+
+@lru_cache(maxsize=None)
+def _enum_context(version, ciphers):
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    ctx.minimum_version = ctx.maximum_version = getattr(ssl.TLSVersion, version)
+    # SECLEVEL=0 lets OpenSSL 3 offer the legacy protocols and suites under test
+    ctx.set_ciphers(ciphers + ":@SECLEVEL=0")
+    return ctx
+
+
+@lru_cache(maxsize=None)
+def _ciphers_available(ciphers):
+    try:
+        _enum_context("TLSv1_2", ciphers)
+        return True
+    except ssl.SSLError:
+        return False
+
+
+def _try_handshake(host, port, sni, version, ciphers, timeout, unreachable):
+    """Returns the negotiated cipher name, or None if the server refused."""
+    if unreachable.is_set():
+        return None
+    start = time.perf_counter()
+    try:
+        sock = connect((host, port), timeout=timeout)
+    except OSError as e:
+        # No point queueing more handshakes against a dead port
+        unreachable.set()
+        metrics.observe("tls.enum", host, start, metrics.classify(e))
+        return None
+    outcome = metrics.OK
+    try:
+        with _enum_context(version, ciphers).wrap_socket(sock, server_hostname=sni) as ssock:
+            return ssock.cipher()[0]
+    except OSError as e:
+        # A refused handshake is an answer; only a timeout counts against the probe
+        outcome = metrics.classify(e) if isinstance(e, TimeoutError) else metrics.OK
+        return None
+    finally:
+        sock.close()
+        metrics.observe("tls.enum", host, start, outcome)
+
+
+def enumerate_tls(host, port=443, sni=None, timeout=5, concurrency=8):
+    """
+    Handshakes once per protocol version, then once per weak cipher group
+    for every accepted version below TLSv1.3, all on a bounded pool.
+    Returns {protocol: [accepted weak cipher groups]}, or None if the port
+    could not be reached.
+    """
+    sni = sni or host
+    unreachable = threading.Event()
+    accepted = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(_try_handshake, host, port, sni, version,
+                            "ALL:COMPLEMENTOFALL", timeout, unreachable): name
+            for name, version, available in PROTOCOLS if available
+        }
+        for future in as_completed(futures):
+            if future.result():
+                accepted[futures[future]] = []
+
+        if unreachable.is_set() and not accepted:
+            return None
+
+        # Cipher groups are only worth testing on versions the server speaks;
+        # TLSv1.3 suites can't be restricted through the ssl module
+        futures = {}
+        for name, version, _ in PROTOCOLS:
+            if name not in accepted or name == "TLSv1.3":
+                continue
+            for group, (ciphers, _) in WEAK_CIPHER_GROUPS.items():
+                if _ciphers_available(ciphers):
+                    future = executor.submit(_try_handshake, host, port, sni, version,
+                                             ciphers, timeout, unreachable)
+                    futures[future] = (name, group)
+        for future in as_completed(futures):
+            if future.result():
+                name, group = futures[future]
+                accepted[name].append(group)
+
+    order = [name for name, _, _ in PROTOCOLS]
+    return {name: sorted(accepted[name]) for name in order if name in accepted}
+
+
+def tls_check(host=None, enum=False):
     banner()
     if not host:
         host = input("Enter host to check TLS/SSL: ").strip()
 
-    section(f"TLS CHECK - {host}")
+    host, port = parse_target(host)
+    section(f"TLS CHECK - {host}:{port}")
     findings = FindingsManager()
+    cfg = module_config("tls")
 
-    try:
-        ctx = ssl.create_default_context()
-        with ctx.wrap_socket(socket.socket(), server_hostname=host) as s:
-            s.settimeout(5)
-            s.connect((host, 443))
-            cert = s.getpeercert()
-
-            exp = datetime.strptime(cert['notAfter'], "%b %d %H:%M:%S %Y %Z")
-            if exp < datetime.utcnow():
-                findings.add(Finding(
-                    "Expired SSL Certificate",
-                    "High",
-                    f"Certificate for {host} expired on {exp}",
-                    "Renew certificate with a valid CA"
-                ))
-            else:
-                good(f"Certificate is valid until {exp}")
+    tls = probe_tls(host, port, timeout=cfg["timeout"])
+    if tls.ok:
+        exp = tls.not_after
+        if exp and exp < datetime.utcnow():
+            findings.add(Finding(
+                "Expired SSL Certificate",
+                "High",
+                f"Certificate for {host} expired on {exp}",
+                "Renew certificate with a valid CA",
+                check_id="tls.expired_certificate"
+            ))
+        elif exp:
+            good(f"Certificate is valid until {exp}")
+
+        protocol = tls.protocol
+        good(f"TLS Protocol Version: {protocol}")
+        if protocol in ["SSLv2","SSLv3","TLSv1","TLSv1.1"]:
+            findings.add(Finding(
+                "Weak TLS/SSL Protocol",
+                "Medium",
+                f"{host} supports outdated protocol {protocol}",
+                "Disable weak protocols, enable TLSv1.2+",
+                check_id="tls.weak_protocol"
+            ))
+    else:
+        bad(f"TLS/SSL check failed: {tls.error}")
 
-            protocol = s.version()
-            good(f"TLS Protocol Version: {protocol}")
-            if protocol in ["SSLv2","SSLv3","TLSv1","TLSv1.1"]:
+    if enum:
+        section("PROTOCOL & CIPHER ENUMERATION")
+        # Enumeration is the expensive part; reuse it while the server keeps
+        # presenting the same certificate
+        cache = get_cache()
+        target = f"{host}:{port}"
+        supported = None
+        if cache and tls.fingerprint:
+            supported = cache.get("tls", target, "tls.enum", tls.fingerprint)
+            if supported is not None:
+                info("Certificate unchanged since last scan, reusing enumeration")
+        if supported is None:
+            supported = enumerate_tls(host, port, timeout=cfg["timeout"],
+                                      concurrency=cfg["concurrency"])
+            if cache and supported is not None:
+                cache.put("tls", target, "tls.enum", supported, tls.fingerprint)
+        if supported is None:
+            warn(f"{host}:{port} is not reachable")
+            supported = {}
+        for name, groups in supported.items():
+            good(f"{name} accepted" + (f" (weak ciphers: {', '.join(groups)})" if groups else ""))
+            # The negotiated protocol was already reported above
+            if name in WEAK_PROTOCOLS and name != tls.protocol:
                 findings.add(Finding(
                     "Weak TLS/SSL Protocol",
                     "Medium",
-                    f"{host} supports outdated protocol {protocol}",
-                    "Disable weak protocols, enable TLSv1.2+"
+                    f"{host}:{port} supports outdated protocol {name}",
+                    "Disable weak protocols, enable TLSv1.2+",
+                    check_id="tls.weak_protocol"
                 ))
 
-    except Exception as e:
-        bad(f"TLS/SSL check failed: {e}")
+        weak_groups = {}
+        for name, groups in supported.items():
+            for group in groups:
+                weak_groups.setdefault(group, []).append(name)
+        for group, names in weak_groups.items():
+            findings.add(Finding(
+                f"Weak TLS Cipher Suites: {group}",
+                WEAK_CIPHER_GROUPS[group][1],
+                f"{host}:{port} accepts {group} cipher suites over {', '.join(names)}",
+                "Disable NULL, anonymous, export, RC4 and DES/3DES cipher suites",
+                check_id="tls.weak_cipher"
+            ))
 
     section("TLS CHECK SUMMARY")
     for sev,count in findings.summary().items():
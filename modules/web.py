@@ -1,11 +1,70 @@
+import json
 import requests
 from urllib.parse import urlparse
 from core.ui import banner, section, info, good, warn, bad
 from core.finding import Finding
 from core.findings import FindingsManager
-import ssl, socket
+from core.scanner import http_get, probe_paths, Throttle
+from core.config_loader import load_config, module_config
+from core.tlsprobe import probe_tls
+from core.cache import get_cache
+from core.fingerprint import identify
 
 COMMON_PATHS = ["/admin", "/backup", "/.git", "/login", "/config"]
+SECURITY_HEADERS = ["Content-Security-Policy","Strict-Transport-Security",
+                    "X-Content-Type-Options","X-Frame-Options","Referrer-Policy"]
+
+
+def _validator(response):
+    """ETag/Last-Modified of a response as a cache validator, or None."""
+    tags = {h: response.headers[h] for h in ("ETag", "Last-Modified") if h in response.headers}
+    return json.dumps(tags, sort_keys=True) if tags else None
+
+
+def _conditional_headers(validator):
+    if not validator:
+        return {}
+    tags = json.loads(validator)
+    headers = {}
+    if "ETag" in tags:
+        headers["If-None-Match"] = tags["ETag"]
+    if "Last-Modified" in tags:
+        headers["If-Modified-Since"] = tags["Last-Modified"]
+    return headers
+
+
+def _header_findings(r, products):
+    findings = []
+    versions = [str(p) for p in products if p.version]
+    if versions:
+        findings.append(Finding(
+            "Server Version Disclosed",
+            "Low",
+            f"Response headers reveal software versions: {', '.join(versions)}",
+            "Remove version details from Server and X-Powered-By headers",
+            check_id="web.version_disclosure"
+        ))
+    for h in SECURITY_HEADERS:
+        if h not in r.headers:
+            findings.append(Finding(
+                f"Missing {h}",
+                "Medium",
+                f"{h} header is not present",
+                f"Configure {h} header properly",
+                check_id="web.missing_header"
+            ))
+
+    for c in r.cookies:
+        if not c.secure or not c.has_nonstandard_attr("HttpOnly"):
+            findings.append(Finding(
+                f"Cookie {c.name} missing security flags",
+                "Medium",
+                "Cookie lacks HttpOnly or Secure flags",
+                "Set Secure and HttpOnly flags for cookies",
+                check_id="web.insecure_cookie"
+            ))
+    return findings
+
 
 def web_scan(url=None):
     banner()
@@ -20,33 +79,34 @@ def web_scan(url=None):
 
     info(f"Target: {url}")
     findings = FindingsManager()
-    headers = {"User-Agent": "Mozilla/5.0"}
+    cfg = module_config("web")
+    throttle = Throttle(cfg["rate_limit"])
+    cache = get_cache()
 
     # HTTP Headers & Cookies
     section("HTTP HEADERS & SERVER INFO")
+    # With incremental scanning, revalidate the last result instead of
+    # re-running the checks when the page hasn't changed
+    cached = cache.lookup("web", url, "web.headers") if cache else None
     try:
-        r = requests.get(url, headers=headers, timeout=10)
+        throttle.wait()
+        r = http_get(url, timeout=cfg["timeout"], check="web.headers",
+                     headers=_conditional_headers(cached[1]) if cached else None)
         good(f"Status Code: {r.status_code}")
         good(f"Server: {r.headers.get('Server','Unknown')}")
+        products = identify(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80),
+                            headers=r.headers)
+        if products:
+            good(f"Fingerprint: {', '.join(map(str, products))}")
 
-        for h in ["Content-Security-Policy","Strict-Transport-Security",
-                  "X-Content-Type-Options","X-Frame-Options","Referrer-Policy"]:
-            if h not in r.headers:
-                findings.add(Finding(
-                    f"Missing {h}",
-                    "Medium",
-                    f"{h} header is not present",
-                    f"Configure {h} header properly"
-                ))
-
-        for c in r.cookies:
-            if not c.secure or not c.has_nonstandard_attr("HttpOnly"):
-                findings.add(Finding(
-                    f"Cookie {c.name} missing security flags",
-                    "Medium",
-                    "Cookie lacks HttpOnly or Secure flags",
-                    "Set Secure and HttpOnly flags for cookies"
-                ))
+        if r.status_code == 304 and cached:
+            info("Page not modified since last scan, reusing header checks")
+            findings.extend(Finding.from_dict(d) for d in cached[0])
+        else:
+            header_findings = _header_findings(r, products)
+            findings.extend(header_findings)
+            if cache:
+                cache.put("web", url, "web.headers", [f.to_dict() for f in header_findings], _validator(r))
     except requests.exceptions.RequestException as e:
         bad(f"Request failed: {e}")
         return []
@@ -55,37 +115,36 @@ def web_scan(url=None):
     section("TLS CHECK")
     hostname = parsed.hostname
     port = parsed.port or 443
-    context = ssl.create_default_context()
-    try:
-        with socket.create_connection((hostname, port), timeout=5) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                version = ssock.version()
-                good(f"TLS version: {version}")
-                if version in ["SSLv2","SSLv3","TLSv1"]:
-                    findings.add(Finding(
-                        "Weak TLS Version",
-                        "High",
-                        f"Server supports insecure TLS version: {version}",
-                        "Upgrade server to TLS 1.2+"
-                    ))
-    except Exception as e:
-        warn(f"TLS check failed: {e}")
+    tls = probe_tls(hostname, port, timeout=cfg["tls_timeout"])
+    if tls.ok:
+        version = tls.protocol
+        good(f"TLS version: {version}")
+        if version in ["SSLv2","SSLv3","TLSv1"]:
+            findings.add(Finding(
+                "Weak TLS Version",
+                "High",
+                f"Server supports insecure TLS version: {version}",
+                "Upgrade server to TLS 1.2+",
+                check_id="web.weak_tls"
+            ))
+    else:
+        warn(f"TLS check failed: {tls.error}")
 
     # Common paths
-    section("COMMON PATHS")
-    info("Scanning common paths...")
-    for path in COMMON_PATHS:
-        try:
-            r = requests.get(url+path, timeout=5, allow_redirects=True)
-            if r.status_code == 200:
-                findings.add(Finding(
-                    f"Exposed path: {path}",
-                    "Medium",
-                    f"{url}{path} is publicly accessible",
-                    "Restrict access or remove unnecessary directories"
-                ))
-        except:
-            continue
+    if load_config().get("scan_common_paths", True):
+        section("COMMON PATHS")
+        info("Scanning common paths...")
+        # Always probed: the page's validators say nothing about other paths
+        exposed = probe_paths(url, COMMON_PATHS, cfg["path_timeout"], cfg["threads"],
+                              throttle, check="web.paths", allow_redirects=True)
+        for path in exposed:
+            findings.add(Finding(
+                f"Exposed path: {path}",
+                "Medium",
+                f"{url}{path} is publicly accessible",
+                "Restrict access or remove unnecessary directories",
+                check_id="web.exposed_path"
+            ))
 
     # Summary
     section("SUMMARY OF FINDINGS")
@@ -1,8 +1,85 @@
 import subprocess
-import re
+import time
 from core.ui import banner, section, info, good, warn, bad
 from core.finding import Finding
 from core.findings import FindingsManager
+from core.config_loader import module_config
+from core import metrics
+
+# Fields requested from nmcli, in terse (-t) output order
+FIELDS = ("BSSID", "SSID", "SECURITY", "SIGNAL", "CHAN")
+
+# Security labels ranked weakest first; a network ranks by its strongest label.
+# Other labels (802.1X, OWE, ...) rank as encrypted
+SECURITY_RANK = {"--": 0, "open": 0, "wep": 1, "wpa1": 2, "wpa2": 3, "wpa3": 4}
+
+
+def split_terse(line):
+    """Splits one line of `nmcli -t` output: fields are ':'-separated, '\\:' and '\\\\' are escapes."""
+    fields, field, escaped = [], [], False
+    for ch in line:
+        if escaped:
+            field.append(ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == ":":
+            fields.append("".join(field))
+            field = []
+        else:
+            field.append(ch)
+    fields.append("".join(field))
+    return fields
+
+
+def list_networks(interface=None, timeout=30):
+    """Runs `nmcli -t` once and returns the visible networks as dicts keyed by FIELDS."""
+    cmd = ["nmcli", "-t", "-f", ",".join(FIELDS), "dev", "wifi", "list"]
+    if interface and interface != "local":
+        cmd += ["ifname", interface]
+
+    with metrics.probe("wireless.nmcli", interface or "local") as probe:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        probe.add_bytes(received=len(result.stdout))
+
+    networks = []
+    for line in result.stdout.splitlines():
+        values = split_terse(line)
+        if len(values) != len(FIELDS):
+            continue
+        net = dict(zip(FIELDS, values))
+        net["SSID"] = net["SSID"] or "<hidden>"
+        networks.append(net)
+    return networks
+
+
+def security_rank(security):
+    return max((SECURITY_RANK.get(label, 2) for label in security.lower().split()), default=0)
+
+
+def network_findings(net):
+    """Findings for one network's own configuration: open or WEP."""
+    ssid, security = net["SSID"], net["SECURITY"]
+    if security_rank(security) == 0:
+        return [Finding(
+            f"Open Wi-Fi Network: {ssid}",
+            "High",
+            f"Network '{ssid}' is open with no encryption",
+            "Use WPA3/WPA2 encryption and avoid open networks",
+            target=net.get("BSSID"),
+            check_id="wifi.open_network"
+        )]
+    if "WEP" in security:
+        return [Finding(
+            f"Weak Wi-Fi Security: {ssid}",
+            "Medium",
+            f"Network '{ssid}' uses outdated WEP encryption",
+            "Upgrade to WPA2/WPA3",
+            target=net.get("BSSID"),
+            check_id="wifi.wep"
+        )]
+    return []
+
 
 def wireless_scan(interface=None):
     """
@@ -15,43 +92,14 @@ def wireless_scan(interface=None):
     findings = FindingsManager()
 
     try:
-        # Build nmcli command
-        cmd = ["nmcli", "-f", "SSID,SECURITY,SIGNAL", "dev", "wifi"]
-        if interface:
-            cmd += ["ifname", interface]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        output = result.stdout.strip()
-
-        if not output:
+        networks = list_networks(interface, module_config("wireless")["timeout"])
+        if not networks:
             info("No Wi-Fi networks found")
             return []
 
-        networks = output.split("\n")[1:]  # Skip header line
         for net in networks:
-            parts = re.split(r'\s{2,}', net)
-            if len(parts) < 3:
-                continue
-            ssid, security, signal = parts[0], parts[1], parts[2]
-            good(f"Detected Wi-Fi: {ssid} | Security: {security} | Signal: {signal}")
-
-            # Open network
-            if security.lower() in ["--", "open"]:
-                findings.add(Finding(
-                    f"Open Wi-Fi Network: {ssid}",
-                    "High",
-                    f"Network '{ssid}' is open with no encryption",
-                    "Use WPA3/WPA2 encryption and avoid open networks"
-                ))
-
-            # Weak security
-            elif "WEP" in security:
-                findings.add(Finding(
-                    f"Weak Wi-Fi Security: {ssid}",
-                    "Medium",
-                    f"Network '{ssid}' uses outdated WEP encryption",
-                    "Upgrade to WPA2/WPA3"
-                ))
+            good(f"Detected Wi-Fi: {net['SSID']} | Security: {net['SECURITY'] or '--'} | Signal: {net['SIGNAL']}")
+            findings.extend(network_findings(net))
 
     except FileNotFoundError:
         warn("nmcli not found. Ensure NetworkManager is installed.")
@@ -65,3 +113,98 @@ def wireless_scan(interface=None):
 
     return findings.findings
 
+
+class WifiMonitor:
+    """
+    Table of access points by BSSID across polls. update() returns only
+    what changed: findings for newly seen open/WEP networks and security
+    downgrades, plus the BSSIDs that disappeared. An AP counts as gone
+    after `grace` consecutive polls without it, so fading signals don't
+    flap.
+    """
+
+    def __init__(self, grace=2):
+        self.grace = grace
+        self.table = {}
+        self._missing = {}
+
+    def update(self, networks):
+        findings, appeared, gone = [], [], []
+        seen = set()
+        for net in networks:
+            bssid = net["BSSID"]
+            seen.add(bssid)
+            self._missing.pop(bssid, None)
+            previous = self.table.get(bssid)
+            self.table[bssid] = net
+            if previous is None:
+                appeared.append(net)
+                findings += network_findings(net)
+            elif security_rank(net["SECURITY"]) < security_rank(previous["SECURITY"]):
+                findings.append(Finding(
+                    f"Wi-Fi Security Downgrade: {net['SSID']}",
+                    "High",
+                    f"Access point {bssid} ('{net['SSID']}') changed from "
+                    f"{previous['SECURITY'] or 'open'} to {net['SECURITY'] or 'open'}",
+                    "Check for a rogue or misconfigured access point impersonating this network",
+                    target=bssid,
+                    check_id="wifi.security_downgrade"
+                ))
+
+        for bssid in list(self.table):
+            if bssid not in seen:
+                self._missing[bssid] = self._missing.get(bssid, 0) + 1
+                if self._missing[bssid] >= self.grace:
+                    del self._missing[bssid]
+                    gone.append(self.table.pop(bssid))
+        return findings, appeared, gone
+
+
+def wifi_monitor(interface=None, interval=None, duration=None, on_findings=None):
+    """
+    Polls nmcli every `interval` seconds (default: config
+    modules.wireless.interval) for `duration` seconds, or until Ctrl+C,
+    printing only changes. on_findings(findings) is called as findings
+    appear; all of them are also returned.
+    """
+    cfg = module_config("wireless")
+    interval = interval or cfg["interval"]
+    monitor = WifiMonitor(cfg["grace"])
+    findings = FindingsManager()
+    section(f"WIRELESS MONITOR - polling every {interval}s")
+
+    deadline = time.monotonic() + duration if duration else None
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                networks = list_networks(interface, cfg["timeout"])
+            except FileNotFoundError:
+                warn("nmcli not found. Ensure NetworkManager is installed.")
+                break
+            except Exception as e:
+                bad(f"Wireless poll failed: {e}")
+                networks = None
+
+            if networks is not None:
+                new, appeared, gone = monitor.update(networks)
+                for net in appeared:
+                    good(f"New AP: {net['SSID']} ({net['BSSID']}) | Security: {net['SECURITY'] or '--'}"
+                         f" | Signal: {net['SIGNAL']}")
+                for net in gone:
+                    warn(f"AP gone: {net['SSID']} ({net['BSSID']})")
+                for finding in new:
+                    bad(finding.title)
+                if new:
+                    findings.extend(new)
+                    if on_findings:
+                        on_findings(new)
+
+            if deadline and time.monotonic() + interval > deadline:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        info("Monitoring stopped")
+
+    info(f"{len(monitor.table)} access points in view, {len(findings)} findings")
+    return findings.findings
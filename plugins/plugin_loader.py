@@ -1,20 +1,199 @@
 import importlib
 import os
+import threading
+from functools import lru_cache
+from core.config_loader import load_config
+from core.engine import Job, host_of
+from core.registry import Registry
+
+# Installed packages can ship plugins under this entry point group; the
+# entry point should name the plugin module (e.g. "acme_checks.tls_pins")
+ENTRY_POINT_GROUP = "kryphorix.plugins"
+
+# Target types a plugin can accept: the targets given to each scan module,
+# or "host" for every distinct host across them
+TARGET_TYPES = ("web", "api", "ad", "ports", "tls", "wireless", "host")
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+class Plugin:
+    """
+    A loaded plugin module. Besides run(), a plugin module may define:
+
+        TARGETS  target types it accepts (see TARGET_TYPES); run(target) is
+                 then called once per matching target. Without TARGETS,
+                 run() is called once with no arguments.
+        KIND     "io" (default) runs on the shared scan pool, "cpu" runs in
+                 a process of its own (at most config plugins.processes at
+                 a time), which is terminated if the call times out
+        TIMEOUT  seconds before a call is abandoned (default: config
+                 plugins.timeout)
+    """
+
+    __slots__ = ("name", "path", "run", "targets", "kind", "timeout")
+
+    def __init__(self, name, path, module):
+        self.name = name
+        self.path = path
+        self.run = module.run
+        self.targets = tuple(getattr(module, "TARGETS", ()))
+        self.kind = getattr(module, "KIND", "io")
+        self.timeout = getattr(module, "TIMEOUT", load_config()["plugins"]["timeout"])
+        unknown = set(self.targets) - set(TARGET_TYPES)
+        if unknown:
+            raise ValueError(f"unknown target types {sorted(unknown)}")
+        if self.kind not in ("io", "cpu"):
+            raise ValueError(f"KIND must be 'io' or 'cpu', not {self.kind!r}")
+
+    def __call__(self, target=None):
+        args = (target,) if self.targets else ()
+        if self.kind == "cpu":
+            return _call_in_process(self, args)
+        return _call_with_timeout(self, args)
+
+    def __repr__(self):
+        return f"Plugin({self.name}, targets={list(self.targets)}, kind={self.kind})"
+
+
+def _call_with_timeout(plugin, args):
+    # A thread can't be killed: on timeout the call is abandoned so the
+    # scan slot frees up, and its result is dropped when it finishes
+    outcome = {}
+    done = threading.Event()
+
+    def call():
+        try:
+            outcome["result"] = plugin.run(*args)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=call, name=f"plugin-{plugin.name}", daemon=True).start()
+    if not done.wait(plugin.timeout):
+        raise TimeoutError(f"plugin {plugin.name} timed out after {plugin.timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
 
-def load_plugins():
-    plugins = []
-    plugins_dir = "plugins"
-    if not os.path.exists(plugins_dir):
-        return plugins  # No plugins folder
 
-    for file in os.listdir(plugins_dir):
-        if file.endswith(".py") and not file.startswith("_") and file != "plugin_loader.py":
-            name = file[:-3]
+def _run_in_process(path, args, conn):
+    try:
+        outcome = ("result", list(importlib.import_module(path).run(*args) or []))
+    except Exception as e:
+        outcome = ("error", e)
+    try:
+        conn.send(outcome)
+    except Exception as e:
+        # Unpicklable result or exception
+        conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+    conn.close()
+
+
+def _process_slots():
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(load_config()["plugins"]["processes"] or os.cpu_count() or 1)
+    return _slots
+
+
+def _call_in_process(plugin, args):
+    # A process per call, unlike a pool worker, can be killed when the call
+    # times out instead of running on and keeping the interpreter alive
+    # Loaded here: multiprocessing is only needed by cpu plugins
+    import multiprocessing
+    with _process_slots():
+        # spawn: forking a process full of scan threads can copy held locks
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_run_in_process, args=(plugin.path, args, sender),
+                                  name=f"plugin-{plugin.name}", daemon=True)
+        process.start()
+        sender.close()
+        try:
+            if not receiver.poll(plugin.timeout):
+                raise TimeoutError(f"plugin {plugin.name} timed out after {plugin.timeout}s")
             try:
-                module = importlib.import_module(f"plugins.{name}")
-                if hasattr(module, "run") and callable(module.run):
-                    plugins.append(module.run)
-            except Exception as e:
-                print(f"[!] Failed to load plugin {name}: {e}")
+                kind, value = receiver.recv()
+            except EOFError:
+                process.join()
+                raise RuntimeError(f"plugin {plugin.name} exited with code {process.exitcode}") from None
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            receiver.close()
+    if kind == "error":
+        raise value
+    return value
+
+
+@lru_cache(maxsize=None)
+def discover_plugins(plugins_dir="plugins"):
+    """
+    Registers plugin files and installed entry points by name without
+    importing them. Discovery runs once per process; files in plugins/
+    take precedence over entry points with the same name.
+    """
+    # Loaded here: importlib.metadata is slow to import and --help doesn't need it
+    from importlib.metadata import entry_points
+    plugins = Registry("plugin")
+    if os.path.exists(plugins_dir):
+        for file in sorted(os.listdir(plugins_dir)):
+            if file.endswith(".py") and not file.startswith("_") and file != "plugin_loader.py":
+                name = file[:-3]
+                plugins.register(name, f"plugins.{name}")
+
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name not in plugins:
+            plugins.register(ep.name, ep.module)
     return plugins
 
+
+@lru_cache(maxsize=None)
+def _load(name):
+    registry = discover_plugins()
+    module = registry.get(name)
+    if not callable(getattr(module, "run", None)):
+        return None  # Helper module without a run()
+    return Plugin(name, registry.path(name), module)
+
+
+def load_plugins(names=None):
+    """Imports the selected plugins (default: all) and returns them as Plugin objects."""
+    plugins = []
+    for name in discover_plugins().names() if names is None else names:
+        try:
+            plugin = _load(name)
+            if plugin:
+                plugins.append(plugin)
+        except Exception as e:
+            print(f"[!] Failed to load plugin {name}: {e}")
+    return plugins
+
+
+def plugin_jobs(plugins, targets):
+    """
+    Builds scheduler Jobs for the plugins, given {target type: [targets]}.
+    Plugins without TARGETS get a single job.
+    """
+    jobs = []
+    for plugin in plugins:
+        module = f"Plugin:{plugin.name}"
+        if not plugin.targets:
+            jobs.append(Job(module, plugin, "local"))
+            continue
+        seen = set()
+        for kind in plugin.targets:
+            if kind == "host":
+                matches = [host_of(t) for k, ts in targets.items() if k != "wireless" for t in ts]
+            else:
+                matches = targets.get(kind, ())
+            for target in matches:
+                if target not in seen:
+                    seen.add(target)
+                    jobs.append(Job(module, plugin, target))
+    return jobs